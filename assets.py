@@ -0,0 +1,289 @@
+# Asset cache with background preloading.
+# content/assets.json names every font, image and sound, groups them, and
+# says which groups each screen uses and which it should preload. A worker
+# thread reads and decodes queued assets from disk ahead of need.
+# acquire() hands out an asset, loading it on the spot if the worker has
+# not reached it yet; release() drops the reference again. Unreferenced
+# assets stay cached until the cache goes over its memory budget, and are
+# then evicted oldest first.
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pygame
+
+from scenario_pack import CONTENT_DIR, FONT_SIZES
+
+ROOT = os.path.dirname(CONTENT_DIR)
+MANIFEST_PATH = os.path.join(CONTENT_DIR, "assets.json")
+KINDS = ("fonts", "images", "sounds")
+
+UNLOADED = 0
+QUEUED = 1
+LOADING = 2
+LOADED = 3
+
+class Asset:
+    __slots__ = ("name", "kind", "spec", "state", "value", "size", "refs", "error", "converted")
+
+    def __init__(self, name, kind, spec):
+        self.name = name
+        self.kind = kind
+        self.spec = spec
+        self.state = UNLOADED
+        self.value = None
+        self.size = 0
+        self.refs = 0
+        self.error = None
+        self.converted = False
+
+def load_manifest(path=MANIFEST_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+def asset_path(spec):
+    return os.path.join(ROOT, spec["file"]) if spec.get("file") else None
+
+# Loaders run on the worker thread, or on the caller's thread as the
+# blocking fallback. Each returns (value, size in bytes).
+def load_font(name, spec):
+    if not pygame.font.get_init():
+        pygame.font.init()
+    path = asset_path(spec)
+    # Sizes come from the content pack, whose compiler measures text with them
+    font = pygame.font.Font(path, FONT_SIZES[name.split("/", 1)[1]])
+    if path is None:
+        path = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    return font, os.path.getsize(path)
+
+def load_image(name, spec):
+    image = pygame.image.load(asset_path(spec))
+    return image, image.get_pitch() * image.get_height()
+
+def load_sound(name, spec):
+    # The mixer is only opened once the first sound is needed
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    sound = pygame.mixer.Sound(asset_path(spec))
+    frequency, size, channels = pygame.mixer.get_init()
+    return sound, int(sound.get_length() * frequency * channels * abs(size) // 8)
+
+LOADERS = {"fonts": load_font, "images": load_image, "sounds": load_sound}
+
+def convert_image(image, spec):
+    # Match the display format so blits need no conversion
+    image = image.convert_alpha() if spec.get("alpha") else image.convert()
+    return image, image.get_pitch() * image.get_height()
+
+class AssetCache:
+    def __init__(self, manifest=None, budget_mb=64):
+        manifest = manifest if manifest is not None else load_manifest()
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.assets = {}
+        for kind in KINDS:
+            for name, spec in manifest.get(kind, {}).items():
+                self.assets[f"{kind}/{name}"] = Asset(f"{kind}/{name}", kind, spec)
+        self.groups = manifest.get("groups", {})
+        self.screens = manifest.get("screens", {})
+        # Loaded assets, least recently released first
+        self.loaded = OrderedDict()
+        self.used = 0
+        # Names acquired by enter() for the current screen
+        self.held = []
+
+        self.preloaded = 0
+        self.blocking_loads = 0
+        self.evictions = 0
+
+        self.lock = threading.Condition()
+        self.queue = queue.Queue()
+        self.thread = None
+
+    # Main thread API
+    def acquire(self, name):
+        with self.lock:
+            asset = self.assets[name]
+            while asset.state == LOADING:
+                # The worker is part way through it
+                self.lock.wait()
+            if asset.state != LOADED:
+                # Not preloaded in time: load it here instead
+                asset.state = LOADING
+                self.blocking_loads += 1
+                self.lock.release()
+                try:
+                    self.load(asset)
+                finally:
+                    self.lock.acquire()
+            if asset.error:
+                error, asset.error = asset.error, None
+                raise error
+            if asset.kind == "images" and not asset.converted:
+                self.convert(asset)
+            asset.refs += 1
+            return asset.value
+
+    def release(self, name):
+        with self.lock:
+            asset = self.assets[name]
+            asset.refs -= 1
+            if asset.refs == 0 and asset.state == LOADED:
+                self.loaded.move_to_end(name)
+                self.evict()
+
+    def start(self):
+        # Preloads queue up until the worker is started, so the game can
+        # hold it back until its first frame is on screen
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, name="assets", daemon=True)
+            self.thread.start()
+
+    def preload(self, names):
+        with self.lock:
+            for name in names:
+                asset = self.assets[name]
+                if asset.state == UNLOADED:
+                    asset.state = QUEUED
+                    self.queue.put(name)
+
+    def group(self, group):
+        return self.groups.get(group, [])
+
+    def screen_entry(self, screen_id):
+        # Exact screen ids first, then the game prefix ("chronos_intro" -> "chronos")
+        return self.screens.get(screen_id) or self.screens.get(screen_id.split("_", 1)[0], {})
+
+    def enter(self, screen_id):
+        # Hold what this screen uses and start loading what may come next
+        entry = self.screen_entry(screen_id)
+        held = [name for group in entry.get("uses", ()) for name in self.group(group)]
+        self.preload(held + [name for group in entry.get("preload", ()) for name in self.group(group)])
+        for name in held:
+            self.acquire(name)
+        for name in self.held:
+            self.release(name)
+        self.held = held
+
+    def stats(self):
+        with self.lock:
+            return {
+                "loaded": len(self.loaded),
+                "used_mb": round(self.used / (1024 * 1024), 2),
+                "budget_mb": round(self.budget / (1024 * 1024), 2),
+                "preloaded": self.preloaded,
+                "blocking_loads": self.blocking_loads,
+                "evictions": self.evictions
+            }
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    # Worker thread
+    def work(self):
+        while True:
+            name = self.queue.get()
+            if name is None:
+                break
+            with self.lock:
+                asset = self.assets[name]
+                # acquire() may have loaded it first
+                if asset.state != QUEUED:
+                    continue
+                asset.state = LOADING
+            self.load(asset)
+            with self.lock:
+                self.preloaded += 1
+
+    def load(self, asset):
+        # Decoding happens outside the lock; the result is published under it
+        converted = False
+        try:
+            value, size = LOADERS[asset.kind](asset.name, asset.spec)
+            if asset.kind == "images" and pygame.display.get_surface() is not None:
+                value, size = convert_image(value, asset.spec)
+                converted = True
+            error = None
+        except (pygame.error, OSError) as exc:
+            value, size, error = None, 0, exc
+        with self.lock:
+            asset.value = value
+            asset.size = size
+            asset.converted = converted
+            asset.error = error
+            if error is None:
+                asset.state = LOADED
+                self.loaded[asset.name] = asset
+                self.used += size
+                self.evict()
+            else:
+                asset.state = UNLOADED
+            self.lock.notify_all()
+
+    def convert(self, asset):
+        # Images decoded before the display was opened are converted at
+        # first use instead
+        image, size = convert_image(asset.value, asset.spec)
+        self.used += size - asset.size
+        asset.value = image
+        asset.size = size
+        asset.converted = True
+
+    def evict(self):
+        # Called with the lock held
+        for name in list(self.loaded):
+            if self.used <= self.budget:
+                break
+            asset = self.loaded[name]
+            if asset.refs:
+                continue
+            del self.loaded[name]
+            self.used -= asset.size
+            asset.value = None
+            asset.size = 0
+            asset.state = UNLOADED
+            self.evictions += 1
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the asset manifest by loading every asset.")
+    parser.add_argument("manifest", nargs="?", default=MANIFEST_PATH)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    cache = AssetCache(load_manifest(args.manifest), budget_mb=1024)
+    status = 0
+    for group, names in cache.groups.items():
+        for name in names:
+            if name not in cache.assets:
+                print(f"group {group}: unknown asset {name}")
+                status = 1
+    for screen_id, entry in cache.screens.items():
+        for group in entry.get("uses", []) + entry.get("preload", []):
+            if group not in cache.groups:
+                print(f"screen {screen_id}: unknown group {group}")
+                status = 1
+    for name, asset in cache.assets.items():
+        start = time.perf_counter()
+        try:
+            cache.acquire(name)
+        except (pygame.error, OSError) as exc:
+            print(f"{name:<24} failed: {exc}")
+            status = 1
+            continue
+        print(f"{name:<24} {asset.size / 1024:>9.0f} KB {(time.perf_counter() - start) * 1000:>8.1f} ms")
+    print(cache.stats())
+    pygame.quit()
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
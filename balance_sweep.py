@@ -0,0 +1,199 @@
+# Parallel balance sweep for the Aetherian Gauntlet.
+# A sweep spec gives alternative values for any role profile target,
+# scenario trait delta and the adept threshold. Every combination is
+# evaluated exactly with the ending state graph on a process pool, and
+# results are appended to a JSON Lines file as they finish. Rerunning the
+# same command skips configurations that are already in the file; every
+# result carries an id of its sweep, so a file written for another spec
+# is never resumed.
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ending_graph import StateGraph
+from game_engine import ROLE_PROFILES, SCENARIO_VALUES, ADEPT_ALIGNMENT
+
+# Example spec:
+# {
+#   "role_profiles": {"Mage": {"Curiosity": [2, 3, 4]}},
+#   "scenario_values": {"4": {"C": {"Curiosity": [1, 2, 3]}}},
+#   "adept_alignment": [60, 65, 70, 75]
+# }
+# Lists are alternatives; anything not mentioned keeps its current value.
+
+def sweep_axes(spec):
+    # Flatten the spec into [(path, values)] for every swept leaf
+    axes = []
+
+    def walk(node, path):
+        for key, value in node.items():
+            if isinstance(value, dict):
+                walk(value, path + (key,))
+            else:
+                axes.append((path + (key,), value if isinstance(value, list) else [value]))
+
+    for section in ("role_profiles", "scenario_values"):
+        walk(spec.get(section, {}), (section,))
+    return axes
+
+def check_axes(axes):
+    # Every swept path has to name an existing rule value; a misspelled
+    # key would otherwise be ignored and sweep nothing
+    defaults = {"role_profiles": ROLE_PROFILES, "scenario_values": SCENARIO_VALUES}
+    for path, values in axes:
+        name = ".".join(path)
+        node = defaults[path[0]]
+        for depth, key in enumerate(path[1:]):
+            if path[0] == "scenario_values" and depth == 0 and key.isdecimal():
+                key = int(key)
+            if not isinstance(node, dict) or key not in node:
+                raise ValueError(f"Unknown sweep target: {name}")
+            node = node[key]
+        if isinstance(node, dict):
+            raise ValueError(f"Sweep target {name} is not a single value")
+        if not values or not all(type(value) is int for value in values):
+            raise ValueError(f"Sweep values for {name} must be integers")
+
+def thresholds_of(spec):
+    thresholds = spec.get("adept_alignment", [ADEPT_ALIGNMENT])
+    return thresholds if isinstance(thresholds, list) else [thresholds]
+
+def build_config(axes, values):
+    config = {"role_profiles": copy.deepcopy(ROLE_PROFILES),
+              "scenario_values": copy.deepcopy(SCENARIO_VALUES)}
+    for (path, _), value in zip(axes, values):
+        node = config[path[0]]
+        keys = list(path[1:])
+        if path[0] == "scenario_values":
+            # JSON object keys are strings; scenarios are numbered
+            keys[0] = int(keys[0])
+        for key in keys[:-1]:
+            node = node[key]
+        node[keys[-1]] = value
+    return config
+
+def configurations(axes):
+    return itertools.product(*(values for _, values in axes))
+
+def sweep_id(spec):
+    # Config indexes only mean the same parameters for the same spec and
+    # the same defaults it varies
+    text = json.dumps([spec, ROLE_PROFILES, SCENARIO_VALUES, ADEPT_ALIGNMENT], sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def evaluate(task):
+    # Probability of the adept ending per role for each threshold, with
+    # roles and choices equally likely. Same rule as
+    # GameSession.aetherian_ending: alignment >= threshold.
+    index, sweep, axes, values, thresholds = task
+    config = build_config(axes, values)
+    graph = StateGraph("aetherian", role_profiles=config["role_profiles"],
+                       scenario_values=config["scenario_values"]).build()
+
+    final_states = []
+    for state, (probability, _) in graph.levels[-1].items():
+        final_states.append((state[0], probability, graph.session(state).calculate_alignment()))
+
+    endings = {}
+    for threshold in thresholds:
+        adept = dict.fromkeys(graph.roles, 0.0)
+        for role, probability, alignment in final_states:
+            if alignment >= threshold:
+                adept[role] += probability
+        share = 1 / len(graph.roles)
+        row = {role: round(adept[role] / share, 6) for role in graph.roles}
+        row["all"] = round(sum(adept.values()), 6)
+        endings[str(threshold)] = row
+
+    return {
+        "sweep": sweep,
+        "config": index,
+        "params": {".".join(map(str, path)): value for (path, _), value in zip(axes, values)},
+        "adept": endings
+    }
+
+def completed(path, sweep):
+    # Config indexes already in the output. A last line cut off by an
+    # interrupted run is dropped so the file stays valid JSON Lines; any
+    # other unreadable line stops the resume.
+    done = set()
+    if not os.path.exists(path):
+        return done
+    valid_end = 0
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if not line.endswith(b"\n"):
+                break
+            try:
+                result = json.loads(line)
+                config = result["config"]
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(f"{path} line {number} is not a sweep result; "
+                                 "fix or remove it to resume")
+            if result.get("sweep") != sweep:
+                raise ValueError(f"{path} holds results of a different sweep spec; "
+                                 "use a new output file")
+            done.add(config)
+            valid_end += len(line)
+    if valid_end != os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
+    return done
+
+def run_sweep(spec, output, workers=None, batch_size=None):
+    axes = sweep_axes(spec)
+    check_axes(axes)
+    thresholds = thresholds_of(spec)
+    if not thresholds or not all(type(threshold) in (int, float) for threshold in thresholds):
+        raise ValueError("adept_alignment values must be numbers")
+    total = 1
+    for _, values in axes:
+        total *= len(values)
+
+    sweep = sweep_id(spec)
+    done = completed(output, sweep)
+    pending = ((index, sweep, axes, values, thresholds)
+               for index, values in enumerate(configurations(axes)) if index not in done)
+    workers = workers or os.cpu_count()
+    # Bounded batches keep memory flat however large the sweep is
+    batch_size = batch_size or workers * 64
+    finished = len(done)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(workers) as executor, open(output, "a") as out:
+        while True:
+            batch = list(itertools.islice(pending, batch_size))
+            if not batch:
+                break
+            for result in executor.map(evaluate, batch, chunksize=max(1, len(batch) // (workers * 4))):
+                out.write(json.dumps(result) + "\n")
+            out.flush()
+            finished += len(batch)
+            rate = (finished - len(done)) / (time.perf_counter() - start)
+            print(f"{finished}/{total} configurations ({rate:.0f}/s)", file=sys.stderr)
+    return finished
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep Aetherian balance parameters in parallel.")
+    parser.add_argument("spec", help="JSON sweep spec")
+    parser.add_argument("-o", "--output", default="sweep.jsonl",
+                        help="JSON Lines results; an existing file is resumed")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    try:
+        run_sweep(spec, args.output, args.workers)
+    except ValueError as exc:
+        parser.error(str(exc))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# Vectorized scoring of many playthroughs at once.
+# Choice sequences come in as an N x scenarios array and every rule from
+# game_engine.GameSession is applied to all N rows with NumPy, one
+# scenario column at a time. Results match GameSession exactly, including
+# the min(100, ...) / max(0, ...) clamping after every choice.
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from game_engine import (GameSession, ROLES, TRAITS, AETHERIAN_CHOICES, CHRONOS_CHOICES, VOID_CHOICES,
+                         GAMES, ROLE_PROFILES, SCENARIO_VALUES, CHRONOS_SCENARIOS, VOID_SCENARIOS,
+                         ADEPT_ALIGNMENT, PRESERVER_INTEGRITY, BALANCED_INTEGRITY, MADNESS_SANITY, SAFE_SANITY,
+                         choice_options, profile_table, scenario_table)
+
+# Ending IDs are returned as int8 codes into these tuples, which keeps
+# tens of millions of rows out of string arrays
+ENDINGS = {
+    "aetherian": ("aetherian_aberration", "aetherian_adept"),
+    "chronos": ("chronos_breaker", "chronos_balanced", "chronos_preserver"),
+    "void": ("void_ending_mixed", "void_ending_madness", "void_ending_safe")
+}
+
+# Per-choice stat changes, in CHRONOS_CHOICES / VOID_CHOICES order
+CHRONOS_INTEGRITY = np.array([5, -10, 0])
+VOID_SANITY = np.array([10, -20, -5])
+
+def encode(values, names):
+    # Map labels (or pass through indexes) to integer codes. Indexes are
+    # range checked, since NumPy would read -1 as the last option.
+    values = np.asarray(values)
+    if values.dtype.kind in "iu":
+        if values.size and (values.min() < 0 or values.max() >= len(names)):
+            raise ValueError(f"Choice or role indexes must be 0 to {len(names) - 1}")
+        return values
+    codes = np.full(values.shape, -1, dtype=np.int8)
+    for code, name in enumerate(names):
+        codes[values == name] = code
+    if (codes < 0).any():
+        unknown = values[codes < 0][0]
+        raise ValueError(f"Unknown choice or role: {unknown}")
+    return codes
+
+def encode_choices(choices, names, length):
+    # One row per playthrough, one column per scenario
+    choices = encode(choices, names)
+    if choices.ndim != 2 or choices.shape[1] != length:
+        raise ValueError(f"Choices need one column per scenario ({length}), got shape {choices.shape}")
+    return choices
+
+def evaluate_aetherian(choices, roles, role_profiles=None, scenario_values=None, adept_alignment=ADEPT_ALIGNMENT):
+    role_profiles = role_profiles or ROLE_PROFILES
+    scenario_values = scenario_values or SCENARIO_VALUES
+    choices = encode_choices(choices, AETHERIAN_CHOICES, len(scenario_values))
+    roles = np.broadcast_to(encode(roles, ROLES), choices.shape[:1])
+
+    # values[scenario, choice, trait] and profiles[role, trait]
+    values = np.array(scenario_table(scenario_values))
+    role_profiles = profile_table(role_profiles)
+    profiles = np.array([role_profiles[role] for role in ROLES])
+
+    traits = np.zeros((len(choices), len(TRAITS)), dtype=np.int64)
+    for scenario in range(choices.shape[1]):
+        traits += values[scenario][choices[:, scenario]]
+
+    # Same arithmetic as GameSession.calculate_alignment
+    score = (3 - np.abs(traits - profiles[roles])).sum(axis=1)
+    alignment = score / 12 * 100
+    return {
+        "traits": traits,
+        "alignment": alignment,
+        "ending": (alignment >= adept_alignment).astype(np.int8)
+    }
+
+def evaluate_chronos(choices):
+    choices = encode_choices(choices, CHRONOS_CHOICES, CHRONOS_SCENARIOS)
+    integrity = np.full(len(choices), 100, dtype=np.int64)
+    for scenario in range(choices.shape[1]):
+        integrity = np.clip(integrity + CHRONOS_INTEGRITY[choices[:, scenario]], 0, 100)
+
+    counts = np.stack([(choices == code).sum(axis=1) for code in range(len(CHRONOS_CHOICES))], axis=1)
+    code = np.select([integrity >= PRESERVER_INTEGRITY, integrity >= BALANCED_INTEGRITY], [2, 1], 0)
+    return {
+        "choices": counts,
+        "timeline_integrity": integrity,
+        "ending": code.astype(np.int8)
+    }
+
+def evaluate_void(choices):
+    choices = encode_choices(choices, VOID_CHOICES, VOID_SCENARIOS)
+    sanity = np.full(len(choices), 100, dtype=np.int64)
+    for scenario in range(choices.shape[1]):
+        sanity = np.clip(sanity + VOID_SANITY[choices[:, scenario]], 0, 100)
+
+    code = np.select([sanity <= MADNESS_SANITY, sanity >= SAFE_SANITY], [1, 2], 0)
+    return {
+        "sanity": sanity,
+        "ending": code.astype(np.int8)
+    }
+
+def evaluate(game, choices, roles=None, **rules):
+    if game == "aetherian":
+        return evaluate_aetherian(choices, roles, **rules)
+    elif game == "chronos":
+        return evaluate_chronos(choices)
+    elif game == "void":
+        return evaluate_void(choices)
+    raise ValueError(f"Unknown game: {game}")
+
+def ending_counts(game, result):
+    counts = np.bincount(result["ending"], minlength=len(ENDINGS[game]))
+    return dict(zip(ENDINGS[game], counts.tolist()))
+
+def check(game, choices, roles=None):
+    # Compare against GameSession row by row; returns mismatching rows
+    from game_engine import play
+    result = evaluate(game, choices, roles)
+    options, _ = choice_options(game)
+    codes = encode(choices, options)
+    role_codes = np.broadcast_to(encode(roles, ROLES), codes.shape[:1]) if game == "aetherian" else None
+    endings = ENDINGS[game]
+    mismatches = []
+    for i, row in enumerate(codes):
+        role = ROLES[role_codes[i]] if role_codes is not None else None
+        ending, session = play(game, [options[code] for code in row], role, GameSession())
+        if game == "aetherian":
+            same = (session.calculate_alignment() == result["alignment"][i]
+                    and session.choices == result["traits"][i].tolist())
+        elif game == "chronos":
+            same = session.timeline_integrity == result["timeline_integrity"][i]
+        else:
+            same = session.sanity == result["sanity"][i]
+        if not same or ending != endings[result["ending"][i]]:
+            mismatches.append(i)
+    return mismatches
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score many playthroughs at once with NumPy.")
+    parser.add_argument("game", choices=GAMES)
+    parser.add_argument("choices", nargs="?", help=".npy file of choice indexes, one row per playthrough")
+    parser.add_argument("--roles", help=".npy file of role indexes for aetherian rows")
+    parser.add_argument("--random", type=int, metavar="N", help="score N random playthroughs instead")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--check", type=int, default=0, metavar="K",
+                        help="also verify the first K rows against GameSession")
+    args = parser.parse_args(argv)
+
+    options, length = choice_options(args.game)
+    if args.random:
+        rng = np.random.default_rng(args.seed)
+        choices = rng.integers(len(options), size=(args.random, length), dtype=np.int8)
+        roles = rng.integers(len(ROLES), size=args.random, dtype=np.int8)
+    elif args.choices:
+        choices = np.load(args.choices)
+        roles = np.load(args.roles) if args.roles else None
+    else:
+        parser.error("give a choices file or --random N")
+    if args.game == "aetherian" and roles is None:
+        parser.error("aetherian rows need --roles")
+
+    start = time.perf_counter()
+    try:
+        result = evaluate(args.game, choices, roles)
+    except ValueError as exc:
+        parser.error(str(exc))
+    elapsed = time.perf_counter() - start
+
+    counts = ending_counts(args.game, result)
+    for name, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"{name:<24} {count:>10} {count / len(choices) * 100:6.2f}%")
+    print(f"{len(choices)} rows in {elapsed:.3f}s ({len(choices) / elapsed:,.0f} rows/s)")
+
+    if args.check:
+        mismatches = check(args.game, choices[:args.check], None if roles is None else roles[:args.check])
+        print(f"checked {min(args.check, len(choices))} rows against GameSession: {len(mismatches)} mismatches")
+        return 1 if mismatches else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
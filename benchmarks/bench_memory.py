@@ -0,0 +1,95 @@
+# Per-instance memory report for the objects a process holds many of.
+# Builds N instances of each and divides the Python heap growth reported
+# by tracemalloc by N. Pixel buffers of pygame surfaces live outside the
+# Python heap and are not counted.
+import argparse
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def per_instance(factory, count):
+    # Warm up caches (fonts, text surfaces, compiled tables) first
+    keep = [factory(i) for i in range(8)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return (after - before) / count
+
+def played_session(GameSession, play):
+    # A session part way through each game, so every tally is in use
+    def factory(i):
+        session = GameSession()
+        play("aetherian", ["A", "C"], "Mage", session)
+        play("chronos", ["preserve"], None, session)
+        play("void", ["use", "study"], None, session)
+        return session
+    return factory
+
+def timeline_step(GameSession, count):
+    # Bytes each recorded choice adds to a session's history
+    session = GameSession(history=True)
+    session.current_screen = "void_scenario_1"
+    session.record()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        session.record()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+def measure(count):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.path.insert(0, ROOT)
+    import pygame
+    import game_main
+    from game_engine import GameSession, play
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    rows = {
+        "GameSession": per_instance(played_session(GameSession, play), count),
+        "GameState": per_instance(lambda i: game_main.GameState(i), max(1, count // 10)),
+        "Button": per_instance(lambda i: game_main.Button(412, 500, 200, 50, "Choose A"), count),
+        "ParticleSystem": per_instance(
+            lambda i: game_main.ParticleSystem(game_main.MENU_PARTICLE_COUNT, (1, 3), (0.2, 1.0),
+                                               [(100, 80, 120)], i), max(1, count // 10)),
+        "Timeline step": timeline_step(GameSession, count)
+    }
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report Python heap bytes per instance.")
+    parser.add_argument("--count", type=int, default=10000, help="instances to build per class")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    rows = measure(args.count)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'class':<16} {'bytes':>10} {'baseline':>10} {'saved':>8}")
+    for name, size in rows.items():
+        if name in baseline:
+            old = baseline[name]
+            print(f"{name:<16} {size:>10.0f} {old:>10.0f} {(old - size) / old * 100:>7.0f}%")
+        else:
+            print(f"{name:<16} {size:>10.0f}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
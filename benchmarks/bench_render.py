@@ -0,0 +1,214 @@
+# Headless rendering benchmark for every screen in the content pack.
+# Each screen runs in a fresh interpreter under the SDL dummy drivers, so
+# caches and peak RSS belong to that screen alone. The mouse is scripted to
+# sweep across the screen's buttons, which exercises hover repaints the
+# same way every run. Each transition kind is benchmarked as well, by
+# switching back and forth between two screens that use it.
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "render_baseline.json")
+
+# Metrics compared against the baseline; True when higher is better
+METRICS = {"fps": True, "alloc_kb": False, "peak_rss_mb": False}
+# Differences smaller than these are noise, whatever the percentage
+NOISE_FLOOR = {"fps": 0.0, "alloc_kb": 1.0, "peak_rss_mb": 2.0}
+
+# Screens that need a run in progress to be drawn
+SETUP = {
+    "aetherian_judgment": ("aetherian", ["A", "C", "C", "B"], "Mage"),
+    "chronos_ending": ("chronos", ["preserve", "intervene", "knowledge"], None)
+}
+
+# Screens switched between to run each transition
+TRANSITIONS = {
+    "transition:crossfade": ("aetherian_intro", "aetherian_scenario_1"),
+    "transition:fade": ("main_menu", "chronos_intro"),
+    "transition:void": ("void_scenario_1", "void_scenario_2")
+}
+
+# Frames each mouse position is held for
+HOLD_FRAMES = 10
+
+def mouse_path(buttons):
+    # Over each button, then off all of them
+    path = []
+    for button in buttons:
+        path.append(button.rect.center)
+        path.append((0, 0))
+    return path or [(0, 0)]
+
+def run_screen(screen_id, frames, warmup):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.path.insert(0, ROOT)
+    import pygame
+    import game_main
+    from game_engine import play
+
+    game_main.init()
+    if screen_id in SETUP:
+        game, choices, role = SETUP[screen_id]
+        play(game, choices, role, game_main.game_state)
+    if screen_id in TRANSITIONS:
+        return run_transition(screen_id, frames, warmup)
+    game_main.screens.switch(screen_id)
+    active = game_main.screens.active
+
+    path = mouse_path(game_main.widgets.buttons)
+    mouse = [path[0]]
+    pygame.mouse.get_pos = lambda: mouse[0]
+
+    def frame(i):
+        mouse[0] = path[i // HOLD_FRAMES % len(path)]
+        active.draw()
+        game_main.renderer.present()
+        active.update()
+
+    return timed_frames(screen_id, frame, frames, warmup)
+
+def run_transition(screen_id, frames, warmup):
+    import pygame
+    import game_main
+
+    pygame.mouse.get_pos = lambda: (0, 0)
+    pair = TRANSITIONS[screen_id]
+    transitions = game_main.transitions
+    game_main.screens.switch(pair[0])
+
+    def frame(i):
+        # A new transition starts as soon as the last one ends
+        if not transitions.active:
+            game_main.screens.switch(pair[game_main.game_state.current_screen == pair[0]])
+        transitions.draw(game_main.screens.active.draw)
+        game_main.renderer.present()
+
+    return timed_frames(screen_id, frame, frames, warmup)
+
+def timed_frames(screen_id, frame, frames, warmup):
+    start = time.perf_counter()
+    frame(0)
+    cold_ms = (time.perf_counter() - start) * 1000
+    for i in range(1, warmup):
+        frame(i)
+
+    start = time.perf_counter()
+    for i in range(warmup, warmup + frames):
+        frame(i)
+    elapsed = time.perf_counter() - start
+
+    # Allocations are measured in a separate pass so tracing does not
+    # slow down the timed frames
+    alloc_frames = max(20, frames // 4)
+    tracemalloc.start()
+    allocated = 0
+    for i in range(alloc_frames):
+        # clear_traces() also zeroes the peak (reset_peak() needs 3.9), so
+        # the peak after the frame is what the frame allocated
+        tracemalloc.clear_traces()
+        frame(i)
+        allocated += tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "screen": screen_id,
+        "frames": frames,
+        "fps": frames / elapsed,
+        "cold_ms": cold_ms,
+        "alloc_kb": allocated / alloc_frames / 1024,
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                       / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    }
+
+def sample(screen_id, frames, warmup, env):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", screen_id,
+                             "--frames", str(frames), "--warmup", str(warmup)],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def measure(screen_id, runs, frames, warmup, env):
+    # Median of every metric over fresh processes
+    samples = [sample(screen_id, frames, warmup, env) for _ in range(runs)]
+    row = {"screen": screen_id, "frames": frames, "runs": runs}
+    for metric in ("fps", "cold_ms", "alloc_kb", "peak_rss_mb"):
+        row[metric] = statistics.median(s[metric] for s in samples)
+    return row
+
+def screen_ids():
+    sys.path.insert(0, ROOT)
+    from scenario_pack import load_pack
+    return load_pack().screen_ids() + list(TRANSITIONS)
+
+def regressions(results, baseline, threshold):
+    found = []
+    for row in results:
+        base = baseline.get(row["screen"])
+        if base is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = base[metric], row[metric]
+            change = (old - new) if higher_is_better else (new - old)
+            if change > NOISE_FLOOR[metric] and old and change / old * 100 > threshold:
+                found.append(f"{row['screen']}: {metric} {old:.1f} -> {new:.1f}")
+    return found
+
+def print_table(results):
+    print(f"{'screen':<22} {'fps':>9} {'cold ms':>9} {'alloc KB/frame':>15} {'peak RSS MB':>12}")
+    for row in results:
+        print(f"{row['screen']:<22} {row['fps']:>9.0f} {row['cold_ms']:>9.1f} "
+              f"{row['alloc_kb']:>15.1f} {row['peak_rss_mb']:>12.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark rendering of every screen headless.")
+    parser.add_argument("--runs", type=int, default=3, help="processes per screen; medians are reported")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--screen", action="append",
+                        help="benchmark only this screen or transition:<kind>; may repeat")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=15.0,
+                        help="percent change that counts as a regression")
+    parser.add_argument("--child", metavar="SCREEN", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_screen(args.child, args.frames, args.warmup)))
+        return 0
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    screens = args.screen or screen_ids()
+    results = [measure(screen_id, args.runs, args.frames, args.warmup, env) for screen_id in screens]
+    print_table(results)
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump({row["screen"]: row for row in results}, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.threshold)
+        if found:
+            print(f"\nRegressions over {args.threshold:g}%:")
+            for line in found:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions over {args.threshold:g}% against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
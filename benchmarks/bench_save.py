@@ -0,0 +1,60 @@
+# Save/load microbenchmark for savegame.py.
+# Times encoding and decoding a session, an atomic write to disk and a
+# load from it, and the cost of AutoSaver.save() on the calling thread,
+# which is all the frame loop pays for an autosave.
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import savegame
+from game_engine import GameSession, play
+
+def timed(function, count):
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples
+
+def report(name, samples):
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{name:<16} {statistics.median(samples) * 1e6:>10.1f} {p99 * 1e6:>10.1f} {samples[-1] * 1e6:>10.1f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time save and load of a game session.")
+    parser.add_argument("--count", type=int, default=10000, help="iterations for the in-memory steps")
+    parser.add_argument("--writes", type=int, default=200, help="iterations for the disk steps")
+    args = parser.parse_args(argv)
+
+    session = GameSession()
+    play("chronos", ["preserve", "intervene"], None, session)
+    data = savegame.encode(session)
+    target = GameSession()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "bench.sav")
+
+    print(f"save record: {len(data)} bytes")
+    print(f"{'step':<16} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+    report("encode", timed(lambda: savegame.encode(session), args.count))
+    report("decode", timed(lambda: savegame.decode(data, target), args.count))
+    report("save (fsync)", timed(lambda: savegame.save(session, path), args.writes))
+    report("load", timed(lambda: savegame.load(path, target), args.writes))
+
+    autosaver = savegame.AutoSaver(path)
+    report("autosave call", timed(lambda: autosaver.save(session), args.count))
+    autosaver.close()
+    print(f"autosave: {autosaver.saves} requested, {autosaver.writes} written")
+    os.remove(path)
+    os.rmdir(directory)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+# Throughput benchmark for game_server.py.
+# Simulated clients connect, play one random game from the main menu to
+# its ending and disconnect. Reports completed sessions per second,
+# commands per second and command round-trip latency. Runs its own server
+# in the same process unless --connect points at a running one.
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Main menu button per game, then the buttons pressed to reach the first scenario
+GAMES = {
+    "aetherian": ("PRESS 1", None, 4),
+    "chronos": ("PRESS 2", "PRESS 1", 3),
+    "void": ("PRESS 3", "PRESS 1", 4)
+}
+ROLE_BUTTONS = ("PRESS 1", "PRESS 2", "PRESS 3")
+
+async def read_reply(reader):
+    # Every reply has at least one line before its END line
+    try:
+        data = await reader.readuntil(b"\nEND\n")
+    except asyncio.IncompleteReadError:
+        raise ConnectionError("server closed the connection")
+    return data.split(b"\n")[:-2]
+
+async def play(connect, rng, latencies):
+    reader, writer = await connect()
+    try:
+        await read_reply(reader)
+        game = rng.choice(list(GAMES))
+        select, begin, scenarios = GAMES[game]
+        script = [select, begin or rng.choice(ROLE_BUTTONS)]
+        script += [f"CHOOSE {rng.choice('ABC')}" for _ in range(scenarios)]
+        script.append("QUIT")
+        for command in script:
+            start = time.perf_counter()
+            writer.write(command.encode() + b"\n")
+            reply = await read_reply(reader)
+            latencies.append(time.perf_counter() - start)
+            if reply and reply[0].startswith(b"ERR"):
+                raise RuntimeError(f"{command}: {reply[0].decode().strip()}")
+        return len(script)
+    finally:
+        writer.close()
+
+async def run(args):
+    listener = server = None
+    if args.connect:
+        if args.connect.startswith("unix:"):
+            path = args.connect[5:]
+            connect = lambda: asyncio.open_unix_connection(path)
+        else:
+            host, _, port = args.connect.rpartition(":")
+            connect = lambda: asyncio.open_connection(host or "127.0.0.1", int(port))
+    else:
+        sys.path.insert(0, ROOT)
+        import game_server
+        from scenario_pack import load_pack
+        server = game_server.GameServer(load_pack())
+        path = os.path.join(tempfile.mkdtemp(), "game.sock")
+        listener = await game_server.start(server, path=path)
+        connect = lambda: asyncio.open_unix_connection(path)
+
+    rng = random.Random(args.seed)
+    latencies = []
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def client(index):
+        async with limit:
+            return await play(connect, random.Random(rng.random()), latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(client(i) for i in range(args.sessions)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    commands = sum(result for result in results if not isinstance(result, BaseException))
+    completed = len(results) - len(failures)
+    latencies.sort()
+    print(f"{completed} sessions in {elapsed:.2f}s: {completed / elapsed:,.0f} sessions/s, "
+          f"{commands / elapsed:,.0f} commands/s, {args.concurrency} concurrent")
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"round trip: p50 {statistics.median(latencies) * 1000:.2f}ms, p99 {p99 * 1000:.2f}ms")
+    if failures:
+        print(f"{len(failures)} sessions failed, first: {failures[0]!r}")
+    if listener is not None:
+        server.evictor.cancel()
+        listener.close()
+        await listener.wait_closed()
+        os.remove(path)
+    return 1 if failures else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure game server sessions per second.")
+    parser.add_argument("--sessions", type=int, default=5000, help="games to play in total")
+    parser.add_argument("--concurrency", type=int, default=500, help="clients connected at once")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--connect", metavar="HOST:PORT|unix:PATH", help="benchmark a running server")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# Cold-start benchmark for game_main.py.
+# Every sample runs in a fresh interpreter and times the module import,
+# init() (window and game state) and the first rendered frame.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """
+import json, time
+start = time.perf_counter()
+import game_main
+imported = time.perf_counter()
+game_main.init()
+initialized = time.perf_counter()
+game_main.screens.active.draw()
+game_main.renderer.present()
+first_frame = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "init": initialized - imported,
+    "first_frame": first_frame - initialized,
+    "total": first_frame - start,
+}))
+"""
+
+def sample(env):
+    result = subprocess.run([sys.executable, "-c", SAMPLE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold start time of the game.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--display", action="store_true",
+                        help="open a real window instead of using the SDL dummy drivers")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    if not args.display:
+        env.setdefault("SDL_VIDEODRIVER", "dummy")
+        env.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    samples = [sample(env) for _ in range(args.runs)]
+    print(f"{'phase':<12} {'median ms':>10} {'min ms':>10}")
+    for phase in ("import", "init", "first_frame", "total"):
+        values = [s[phase] * 1000 for s in samples]
+        print(f"{phase:<12} {statistics.median(values):>10.1f} {min(values):>10.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# Exhaustive ending-space enumeration for the three games.
+# Playthroughs are folded into a DAG of distinct game states, so paths
+# that reach the same state share everything after it and each state is
+# expanded exactly once.
+import argparse
+import csv
+import json
+import sys
+
+from game_engine import GameSession, GAMES, ROLES, choice_options, profile_table, scenario_table
+
+def state_of(game, session):
+    # The gameplay fields that decide where a game can still go
+    if game == "aetherian":
+        return (session.player_role, session.scenarios_completed, tuple(session.choices))
+    elif game == "chronos":
+        return (session.chronos_scenario, session.time_era, session.timeline_integrity,
+                tuple(session.chronos_choices))
+    elif game == "void":
+        return (session.void_scenario, session.sanity)
+    raise ValueError(f"Unknown game: {game}")
+
+def session_of(game, state, role_profiles=None, scenario_values=None):
+    session = GameSession(role_profiles, scenario_values)
+    if game == "aetherian":
+        session.player_role, session.scenarios_completed, totals = state
+        session.choices = list(totals)
+    elif game == "chronos":
+        session.chronos_scenario, session.time_era, session.timeline_integrity, counts = state
+        session.chronos_choices = list(counts)
+    elif game == "void":
+        session.void_scenario, session.sanity = state
+    return session
+
+class StateGraph:
+    def __init__(self, game, roles=None, role_profiles=None, scenario_values=None):
+        self.game = game
+        # Compiled once so every session rebuilt from a state shares them
+        self.role_profiles = profile_table(role_profiles) if role_profiles else None
+        self.scenario_values = scenario_table(scenario_values) if scenario_values else None
+        self.options, self.depth = choice_options(game)
+        if game == "aetherian":
+            self.depth = len(self.scenario_values or GameSession().scenario_values)
+            self.roles = tuple(roles or ROLES)
+        else:
+            self.roles = (None,)
+
+        # state -> child state per option, filled in as states are expanded
+        self.edges = {}
+        # One dict per depth: state -> [probability, path count]
+        self.levels = []
+        self.endings = {}
+
+    def session(self, state):
+        return session_of(self.game, state, self.role_profiles, self.scenario_values)
+
+    def root(self, role):
+        session = GameSession(self.role_profiles, self.scenario_values)
+        if self.game == "aetherian":
+            session.select_role(role)
+        return state_of(self.game, session)
+
+    def children(self, state):
+        children = self.edges.get(state)
+        if children is None:
+            children = []
+            for option in self.options:
+                session = self.session(state)
+                if self.game == "aetherian":
+                    session.make_choice(option)
+                elif self.game == "chronos":
+                    session.chronos_make_choice(option)
+                else:
+                    session.void_make_choice(option)
+                children.append(state_of(self.game, session))
+            children = self.edges[state] = tuple(children)
+        return children
+
+    def ending(self, state):
+        ending = self.endings.get(state)
+        if ending is None:
+            session = self.session(state)
+            if self.game == "aetherian":
+                ending = session.aetherian_ending()
+            elif self.game == "chronos":
+                ending = session.chronos_ending()
+            else:
+                ending = session.void_ending()
+            self.endings[state] = ending
+        return ending
+
+    def build(self):
+        # Roles and choices are all equally likely
+        level = {}
+        for role in self.roles:
+            level[self.root(role)] = [1 / len(self.roles), 1]
+        self.levels = [level]
+
+        for _ in range(self.depth):
+            next_level = {}
+            for state, (probability, paths) in level.items():
+                share = probability / len(self.options)
+                for child in self.children(state):
+                    entry = next_level.setdefault(child, [0.0, 0])
+                    entry[0] += share
+                    entry[1] += paths
+            level = next_level
+            self.levels.append(level)
+        return self
+
+    def reachability(self):
+        rows = []
+        for depth, level in enumerate(self.levels):
+            rows.append({
+                "game": self.game,
+                "depth": depth,
+                "states": len(level),
+                "paths": sum(paths for _, paths in level.values())
+            })
+        return rows
+
+    def ending_table(self):
+        table = {}
+        for state, (probability, paths) in self.levels[-1].items():
+            role = state[0] if self.game == "aetherian" else None
+            key = (role, self.ending(state))
+            row = table.setdefault(key, {
+                "game": self.game,
+                "role": role or "",
+                "ending": key[1],
+                "probability": 0.0,
+                "paths": 0,
+                "states": 0
+            })
+            row["probability"] += probability
+            row["paths"] += paths
+            row["states"] += 1
+        return sorted(table.values(), key=lambda row: (row["role"], -row["probability"]))
+
+def enumerate_games(games, roles=None):
+    return [StateGraph(game, roles).build() for game in games]
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def print_table(rows):
+    columns = list(rows[0])
+    cells = [[f"{row[column]:.4f}" if isinstance(row[column], float) else str(row[column])
+              for column in columns] for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in cells)) for i, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip())
+    for line in cells:
+        print("  ".join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enumerate every reachable state and ending.")
+    parser.add_argument("games", nargs="*", metavar="GAME", help=f"games to enumerate (default: all of {', '.join(GAMES)})")
+    parser.add_argument("--role", action="append", choices=ROLES, help="limit Aetherian roles; may repeat")
+    parser.add_argument("--json", metavar="PATH", help="write both tables as JSON")
+    parser.add_argument("--csv", metavar="PREFIX", help="write PREFIX_reachability.csv and PREFIX_endings.csv")
+    args = parser.parse_args(argv)
+    for game in args.games:
+        if game not in GAMES:
+            parser.error(f"unknown game: {game}")
+
+    graphs = enumerate_games(args.games or GAMES, args.role)
+    reachability = [row for graph in graphs for row in graph.reachability()]
+    endings = [row for graph in graphs for row in graph.ending_table()]
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"reachability": reachability, "endings": endings}, f, indent=2)
+    if args.csv:
+        write_csv(f"{args.csv}_reachability.csv", reachability)
+        write_csv(f"{args.csv}_endings.csv", endings)
+    if not args.json and not args.csv:
+        print_table(reachability)
+        print()
+        print_table(endings)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
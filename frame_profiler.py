@@ -0,0 +1,120 @@
+# Frame-time profiler for the game loop.
+# Each frame is split into phases timed with perf_counter_ns and filed
+# under the screen that was showing. Samples go into fixed-size ring
+# buffers, so memory stays flat however long the game runs. While the
+# profiler is off every call returns after one attribute check.
+import array
+import csv
+import json
+from time import perf_counter_ns
+
+import numpy as np
+
+# "wait" is the frame cap and idle sleep, "frame" the whole iteration
+PHASES = ("draw", "present", "wait", "events", "update", "frame")
+PERCENTILES = (50, 95, 99)
+
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.samples = array.array("q", bytes(8 * capacity))
+        self.index = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def values(self):
+        # Oldest samples first is not needed for percentiles
+        return np.frombuffer(self.samples, dtype=np.int64)[:self.count]
+
+class FrameProfiler:
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.enabled = False
+        # (screen_id, phase) -> RingBuffer
+        self.buffers = {}
+        self.screen_id = None
+        self.start = 0
+        self.last = 0
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        # Laps already in flight are dropped, not half-recorded
+        self.enabled = False
+        self.screen_id = None
+
+    def reset(self):
+        self.buffers.clear()
+
+    def begin(self, screen_id):
+        if self.enabled:
+            self.screen_id = screen_id
+            self.start = self.last = perf_counter_ns()
+
+    def lap(self, phase):
+        if self.screen_id is not None:
+            now = perf_counter_ns()
+            self.record(self.screen_id, phase, now - self.last)
+            self.last = now
+
+    def end(self):
+        if self.screen_id is not None:
+            self.record(self.screen_id, "frame", perf_counter_ns() - self.start)
+            self.screen_id = None
+
+    def record(self, screen_id, phase, elapsed_ns):
+        buffer = self.buffers.get((screen_id, phase))
+        if buffer is None:
+            buffer = self.buffers[(screen_id, phase)] = RingBuffer(self.capacity)
+        buffer.append(elapsed_ns)
+
+    def screens(self):
+        return list(dict.fromkeys(screen_id for screen_id, _ in self.buffers))
+
+    def stats(self, screen_id, phase):
+        buffer = self.buffers.get((screen_id, phase))
+        if not buffer:
+            return None
+        values = buffer.values() / 1e6
+        p50, p95, p99 = np.percentile(values, PERCENTILES)
+        return {
+            "screen": screen_id,
+            "phase": phase,
+            "samples": len(buffer),
+            "mean_ms": float(values.mean()),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": float(values.max())
+        }
+
+    def summary(self, screen_ids=None):
+        rows = []
+        for screen_id in screen_ids or self.screens():
+            for phase in PHASES:
+                row = self.stats(screen_id, phase)
+                if row:
+                    rows.append(row)
+        return rows
+
+    def write(self, path):
+        # CSV for .csv paths, JSON otherwise
+        rows = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["screen", "phase", "samples", "mean_ms",
+                                                       "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump({"capacity": self.capacity, "phases": rows}, f, indent=2)
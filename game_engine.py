@@ -0,0 +1,373 @@
+# Headless game rules for the RPG Game Collection.
+# Nothing in here touches pygame, so the rules can be imported by tools
+# and simulated without opening a window. The Aetherian trait deltas are
+# read from the content file, next to the screens they belong to.
+import argparse
+import json
+import os
+import random
+import sys
+from array import array
+from collections import Counter
+
+ROLES = ("Warrior", "Mage", "Rogue")
+TRAITS = ("Honor", "Pragmatism", "Curiosity")
+AETHERIAN_CHOICES = ("A", "B", "C")
+CHRONOS_CHOICES = ("preserve", "intervene", "knowledge")
+VOID_CHOICES = ("destroy", "use", "study")
+GAMES = ("aetherian", "chronos", "void")
+CONTENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content", "scenarios.json")
+
+ROLE_PROFILES = {
+    "Warrior": {"Honor": 3, "Pragmatism": 2, "Curiosity": 1},
+    "Mage": {"Honor": 2, "Pragmatism": 1, "Curiosity": 3},
+    "Rogue": {"Honor": 1, "Pragmatism": 3, "Curiosity": 2}
+}
+
+def scenario_values(screens):
+    # {number: {choice: {trait: delta}}} from the "trait_deltas" of the
+    # content screens aetherian_scenario_1, aetherian_scenario_2, ...
+    values = {}
+    while f"aetherian_scenario_{len(values) + 1}" in screens:
+        screen_id = f"aetherian_scenario_{len(values) + 1}"
+        deltas = screens[screen_id].get("trait_deltas")
+        if deltas is None or set(deltas) != set(AETHERIAN_CHOICES):
+            raise ValueError(f"{screen_id} needs trait_deltas for choices {', '.join(AETHERIAN_CHOICES)}")
+        for choice, delta in deltas.items():
+            if not set(delta) <= set(TRAITS) or not all(type(value) is int for value in delta.values()):
+                raise ValueError(f"{screen_id} choice {choice}: deltas must be integers for {', '.join(TRAITS)}")
+        values[len(values) + 1] = deltas
+    if not values:
+        raise ValueError("No Aetherian scenarios in the content")
+    return values
+
+def load_scenario_values(path=CONTENT_PATH):
+    with open(path, encoding="utf-8") as f:
+        return scenario_values(json.load(f)["screens"])
+
+SCENARIO_VALUES = load_scenario_values()
+
+# Sessions keep tallies as lists indexed like TRAITS / CHRONOS_TALLIES
+CHRONOS_TALLIES = ("Preservation", "Intervention", "Knowledge")
+CHOICE_INDEX = {choice: index for index, choice in enumerate(AETHERIAN_CHOICES)}
+
+AETHERIAN_SCENARIOS = len(SCENARIO_VALUES)
+CHRONOS_SCENARIOS = 3
+VOID_SCENARIOS = 4
+CHRONOS_ERAS = ("present", "past", "future")
+
+# Ending thresholds
+ADEPT_ALIGNMENT = 70
+PRESERVER_INTEGRITY = 80
+BALANCED_INTEGRITY = 50
+MADNESS_SANITY = 30
+SAFE_SANITY = 80
+
+# Trait tables
+def profile_table(role_profiles):
+    # {role: {trait: target}} -> {role: targets in TRAITS order}
+    if all(isinstance(profile, tuple) for profile in role_profiles.values()):
+        return role_profiles
+    return {role: tuple(profile.get(trait, 0) for trait in TRAITS) for role, profile in role_profiles.items()}
+
+def scenario_table(scenario_values):
+    # {number: {choice: {trait: delta}}} -> table[scenario][choice index],
+    # each entry the deltas in TRAITS order
+    if isinstance(scenario_values, tuple):
+        return scenario_values
+    return tuple(tuple(tuple(scenario_values[number][choice].get(trait, 0) for trait in TRAITS)
+                       for choice in AETHERIAN_CHOICES)
+                 for number in sorted(scenario_values))
+
+# Shared by every session that plays with the default rules
+PROFILE_TABLE = profile_table(ROLE_PROFILES)
+SCENARIO_TABLE = scenario_table(SCENARIO_VALUES)
+
+# Choice history. Before every choice the whole session state is appended
+# to a flat array as one fixed-size row of small ints, so a step costs
+# STEP_SIZE * 2 bytes. Rows are never changed once written, and rewinding
+# to any step copies back a single row.
+SCREEN_IDS = []
+SCREEN_CODES = {}
+STEP_SIZE = 14
+
+def screen_code(screen_id):
+    code = SCREEN_CODES.get(screen_id)
+    if code is None:
+        code = SCREEN_CODES[screen_id] = len(SCREEN_IDS)
+        SCREEN_IDS.append(screen_id)
+    return code
+
+class Timeline:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = array("h")
+
+    def __len__(self):
+        return len(self.rows) // STEP_SIZE
+
+    def clear(self):
+        del self.rows[:]
+
+    def record(self, session):
+        self.rows.extend((screen_code(session.current_screen),
+                          ROLES.index(session.player_role) if session.player_role else -1,
+                          session.scenarios_completed, *session.choices,
+                          CHRONOS_ERAS.index(session.time_era), session.timeline_integrity,
+                          *session.chronos_choices, session.chronos_scenario,
+                          session.sanity, session.void_scenario))
+
+    def rewind(self, session, step):
+        # Restores the state before choice `step` (0 is before the first)
+        # and forgets every step after it
+        if not 0 <= step < len(self):
+            raise IndexError(f"No step {step} in a timeline of {len(self)}")
+        start = step * STEP_SIZE
+        (screen, role, session.scenarios_completed, honor, pragmatism, curiosity, era,
+         session.timeline_integrity, preservation, intervention, knowledge,
+         session.chronos_scenario, session.sanity, session.void_scenario) = self.rows[start:start + STEP_SIZE]
+        session.current_screen = SCREEN_IDS[screen]
+        session.player_role = ROLES[role] if role >= 0 else None
+        session.choices = [honor, pragmatism, curiosity]
+        session.time_era = CHRONOS_ERAS[era]
+        session.chronos_choices = [preservation, intervention, knowledge]
+        del self.rows[start:]
+
+class GameSession:
+    __slots__ = ("role_profiles", "scenario_values", "current_screen", "player_role", "scenarios_completed",
+                 "choices", "time_era", "timeline_integrity", "chronos_choices", "chronos_scenario",
+                 "sanity", "void_scenario", "timeline")
+
+    def __init__(self, role_profiles=None, scenario_values=None, history=False):
+        self.role_profiles = profile_table(role_profiles) if role_profiles else PROFILE_TABLE
+        self.scenario_values = scenario_table(scenario_values) if scenario_values else SCENARIO_TABLE
+        # Only sessions played by people keep a history; simulations skip it
+        self.timeline = Timeline() if history else None
+        self.reset()
+
+    def reset(self):
+        self.current_screen = "main_menu"
+        self.player_role = None
+        self.scenarios_completed = 0
+        self.choices = [0, 0, 0]
+        self.time_era = "present"
+        self.timeline_integrity = 100
+        self.chronos_choices = [0, 0, 0]
+        self.chronos_scenario = 1
+        self.sanity = 100
+        self.void_scenario = 1
+        if self.timeline is not None:
+            self.timeline.clear()
+
+    # History
+    def steps(self):
+        return len(self.timeline) if self.timeline is not None else 0
+
+    def rewind(self, step):
+        self.timeline.rewind(self, step)
+
+    def undo(self):
+        # Takes back the last choice; False when there is none
+        if not self.steps():
+            return False
+        self.rewind(self.steps() - 1)
+        return True
+
+    def record(self):
+        if self.timeline is not None:
+            self.timeline.record(self)
+
+    def snapshot(self):
+        # Every gameplay field as plain data
+        return {
+            "current_screen": self.current_screen,
+            "player_role": self.player_role,
+            "scenarios_completed": self.scenarios_completed,
+            "choices": dict(zip(TRAITS, self.choices)),
+            "time_era": self.time_era,
+            "timeline_integrity": self.timeline_integrity,
+            "chronos_choices": dict(zip(CHRONOS_TALLIES, self.chronos_choices)),
+            "chronos_scenario": self.chronos_scenario,
+            "sanity": self.sanity,
+            "void_scenario": self.void_scenario
+        }
+
+    # Aetherian Gauntlet
+    def select_role(self, role):
+        self.player_role = role
+        self.current_screen = "aetherian_scenario_1"
+
+    def make_choice(self, choice):
+        self.record()
+        values = self.scenario_values[self.scenarios_completed][CHOICE_INDEX[choice]]
+        for trait, value in enumerate(values):
+            self.choices[trait] += value
+
+        self.scenarios_completed += 1
+
+        if self.scenarios_completed < len(self.scenario_values):
+            self.current_screen = f"aetherian_scenario_{self.scenarios_completed + 1}"
+        else:
+            self.current_screen = "aetherian_judgment"
+
+    def calculate_alignment(self):
+        role_profile = self.role_profiles[self.player_role]
+        alignment_score = 0
+
+        for value, target in zip(self.choices, role_profile):
+            difference = abs(value - target)
+            alignment_score += (3 - difference)
+
+        max_possible = 12
+        return (alignment_score / max_possible) * 100
+
+    def aetherian_ending(self):
+        if self.calculate_alignment() >= ADEPT_ALIGNMENT:
+            return "aetherian_adept"
+        return "aetherian_aberration"
+
+    # Chronos Legacy
+    def chronos_make_choice(self, choice):
+        self.record()
+        if choice == "preserve":
+            self.chronos_choices[0] += 1
+            self.timeline_integrity = min(100, self.timeline_integrity + 5)
+        elif choice == "intervene":
+            self.chronos_choices[1] += 1
+            self.timeline_integrity = max(0, self.timeline_integrity - 10)
+        elif choice == "knowledge":
+            self.chronos_choices[2] += 1
+
+        self.chronos_scenario += 1
+
+        if self.chronos_scenario <= CHRONOS_SCENARIOS:
+            if self.time_era == "present":
+                self.time_era = "past"
+            elif self.time_era == "past":
+                self.time_era = "future"
+            self.current_screen = "chronos_scenario_1"
+        else:
+            self.current_screen = "chronos_ending"
+
+    def chronos_ending(self):
+        if self.timeline_integrity >= PRESERVER_INTEGRITY:
+            return "chronos_preserver"
+        elif self.timeline_integrity >= BALANCED_INTEGRITY:
+            return "chronos_balanced"
+        return "chronos_breaker"
+
+    # Echoes of the Void
+    def void_make_choice(self, choice):
+        self.record()
+        if choice == "destroy":
+            self.sanity = min(100, self.sanity + 10)
+        elif choice == "use":
+            self.sanity = max(0, self.sanity - 20)
+        elif choice == "study":
+            self.sanity = max(0, self.sanity - 5)
+
+        self.void_scenario += 1
+
+        if self.void_scenario <= VOID_SCENARIOS:
+            self.current_screen = f"void_scenario_{self.void_scenario}"
+        else:
+            self.current_screen = self.void_ending()
+
+    def void_ending(self):
+        if self.sanity <= MADNESS_SANITY:
+            return "void_ending_madness"
+        elif self.sanity >= SAFE_SANITY:
+            return "void_ending_safe"
+        return "void_ending_mixed"
+
+# Playthroughs
+def play(game, choices, role=None, session=None):
+    # Play one game from the start with a fixed list of choices and
+    # return (ending, session). Fewer choices than scenarios stop part way.
+    options, length = choice_options(game)
+    if len(choices) > length:
+        raise ValueError(f"{game} has {length} scenarios, got {len(choices)} choices")
+    for choice in choices:
+        if choice not in options:
+            raise ValueError(f"Unknown {game} choice: {choice!r} (expected one of {', '.join(options)})")
+    session = session or GameSession()
+    if game == "aetherian":
+        session.select_role(role)
+        for choice in choices:
+            session.make_choice(choice)
+        return session.aetherian_ending(), session
+    elif game == "chronos":
+        session.current_screen = "chronos_scenario_1"
+        for choice in choices:
+            session.chronos_make_choice(choice)
+        return session.chronos_ending(), session
+    elif game == "void":
+        session.current_screen = "void_scenario_1"
+        for choice in choices:
+            session.void_make_choice(choice)
+        return session.void_ending(), session
+    raise ValueError(f"Unknown game: {game}")
+
+def choice_options(game):
+    if game == "aetherian":
+        return AETHERIAN_CHOICES, AETHERIAN_SCENARIOS
+    elif game == "chronos":
+        return CHRONOS_CHOICES, CHRONOS_SCENARIOS
+    elif game == "void":
+        return VOID_CHOICES, VOID_SCENARIOS
+    raise ValueError(f"Unknown game: {game}")
+
+def run_batch(game, runs, role=None, seed=None, scripts=None):
+    # Play `runs` random playthroughs, or every entry of `scripts` when
+    # given, and count the endings reached
+    endings = Counter()
+    if scripts is not None:
+        for script in scripts:
+            endings[play(game, script, role)[0]] += 1
+        return endings
+
+    rng = random.Random(seed)
+    options, length = choice_options(game)
+    session = GameSession()
+    for _ in range(runs):
+        session.reset()
+        run_role = role or rng.choice(ROLES)
+        ending, _ = play(game, rng.choices(options, k=length), run_role, session)
+        endings[ending] += 1
+    return endings
+
+def format_distribution(endings):
+    total = sum(endings.values())
+    lines = []
+    for ending, count in endings.most_common():
+        lines.append(f"{ending:<24} {count:>10} {count / total * 100:6.2f}%")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate playthroughs without opening a window.")
+    parser.add_argument("game", choices=GAMES)
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--role", choices=ROLES, help="Aetherian role (random per run by default)")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--script", action="append", metavar="CHOICES",
+                        help="comma-separated choices to play instead of random runs; may repeat")
+    args = parser.parse_args(argv)
+
+    scripts = [script.split(",") for script in args.script] if args.script else None
+    if args.game == "aetherian" and scripts and not args.role:
+        parser.error("--script for aetherian needs --role")
+    options, length = choice_options(args.game)
+    for script in scripts or ():
+        unknown = [choice for choice in script if choice not in options]
+        if unknown:
+            parser.error(f"unknown {args.game} choice {unknown[0]!r} in --script; "
+                         f"expected one of {', '.join(options)}")
+        if len(script) != length:
+            parser.error(f"--script for {args.game} needs {length} choices, got {len(script)}")
+    endings = run_batch(args.game, args.runs, args.role, args.seed, scripts)
+    print(format_distribution(endings))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
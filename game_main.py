@@ -1,1396 +1,991 @@
 import pygame
 import sys
+import argparse
+import secrets
 import math
-import random
-from pygame import mixer
-
-pygame.init()
-mixer.init()
+from collections import OrderedDict
+from functools import partial
+import numpy as np
+from game_engine import GameSession, VOID_SCENARIOS
+from scenario_pack import COLORS, CONTENT_FIELDS, VARIANT_SOURCES, CHOICE_ACTIONS, load_pack
+from assets import AssetCache
+from frame_profiler import FrameProfiler
 
 SCREEN_WIDTH, SCREEN_HEIGHT = 1024, 768
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("RPG Game Collection")
-
+FPS = 60
+MENU_PARTICLE_COUNT = 50
+VOID_PARTICLE_COUNT = 30
+
+# Created by init() so importing this module has no side effects
+screen = None
+renderer = None
+game_state = None
+content = None
+# Set by main() when --telemetry is given
+telemetry = None
+# Set by main() unless --no-autosave is given
+autosaver = None
+# Created by init() with the renderer
+transitions = None
+
+# Named colors are shared with the content pack
 BACKGROUND = (20, 12, 28)
-TEXT_COLOR = (222, 207, 184)
-HIGHLIGHT = (255, 215, 0)
-BUTTON_COLOR = (60, 40, 70)
-BUTTON_HOVER = (90, 60, 100)
-AETHERIAN_COLOR = (180, 50, 50)
-MAGE_COLOR = (50, 100, 180)
-ROGUE_COLOR = (50, 150, 50)
-CHRONOS_COLOR = (50, 100, 180)
-VOID_COLOR = (80, 30, 100)
-
-title_font = pygame.font.Font(None, 72)
-heading_font = pygame.font.Font(None, 48)
-text_font = pygame.font.Font(None, 36)
-small_font = pygame.font.Font(None, 28)
-
-class GameState:
-    def __init__(self):
-        self.current_screen = "main_menu"
-        self.player_role = None
-        self.scenarios_completed = 0
-        self.choices = {"Honor": 0, "Pragmatism": 0, "Curiosity": 0}
-        self.role_profiles = {
-            "Warrior": {"Honor": 3, "Pragmatism": 2, "Curiosity": 1},
-            "Mage": {"Honor": 2, "Pragmatism": 1, "Curiosity": 3},
-            "Rogue": {"Honor": 1, "Pragmatism": 3, "Curiosity": 2}
-        }
-        self.scenario_values = {
-            1: {"A": {"Honor": 2, "Pragmatism": 0, "Curiosity": 0},
-                "B": {"Honor": 0, "Pragmatism": 2, "Curiosity": 0},
-                "C": {"Honor": 0, "Pragmatism": 0, "Curiosity": 2}},
-            2: {"A": {"Honor": 2, "Pragmatism": 0, "Curiosity": 1},
-                "B": {"Honor": 0, "Pragmatism": 2, "Curiosity": 0},
-                "C": {"Honor": 1, "Pragmatism": 1, "Curiosity": 2}},
-            3: {"A": {"Honor": 2, "Pragmatism": 1, "Curiosity": 0},
-                "B": {"Honor": 0, "Pragmatism": 2, "Curiosity": 1},
-                "C": {"Honor": 1, "Pragmatism": 0, "Curiosity": 2}},
-            4: {"A": {"Honor": 3, "Pragmatism": 0, "Curiosity": 0},
-                "B": {"Honor": 0, "Pragmatism": 3, "Curiosity": 0},
-                "C": {"Honor": 0, "Pragmatism": 0, "Curiosity": 3}}
-        }
-        self.text_queue = []
-        self.current_text = ""
-        self.text_progress = 0
-        self.text_speed = 2
-        self.typing = False
-        self.particles = []
-        self.fade_alpha = 0
-        self.fade_direction = 1
-        
-        self.time_era = "present"
-        self.timeline_integrity = 100
-        self.chronos_choices = {"Preservation": 0, "Intervention": 0, "Knowledge": 0}
-        self.chronos_scenario = 1
+TEXT_COLOR = COLORS["TEXT_COLOR"]
+HIGHLIGHT = COLORS["HIGHLIGHT"]
+BUTTON_COLOR = COLORS["BUTTON_COLOR"]
+BUTTON_HOVER = COLORS["BUTTON_HOVER"]
+
+# Fonts, images and sounds listed in content/assets.json. Nothing is read
+# from disk until a screen is entered or an asset is first used.
+assets = AssetCache(budget_mb=64)
+
+# Fonts are taken from the asset cache the first time they are used and
+# held for the life of the game
+class LazyFont:
+    def __init__(self, name):
+        self.name = name
+        self.font = None
+
+    def load(self):
+        if self.font is None:
+            self.font = assets.acquire(f"fonts/{self.name}")
+        return self.font
+
+    def render(self, text, antialias, color):
+        return self.load().render(text, antialias, color)
+
+    def size(self, text):
+        return self.load().size(text)
+
+title_font = LazyFont("title")
+heading_font = LazyFont("heading")
+text_font = LazyFont("text")
+small_font = LazyFont("small")
+FONTS = {"title": title_font, "heading": heading_font, "text": text_font, "small": small_font}
+
+# Text surface cache shared by every screen
+class TextCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+text_cache = TextCache()
+
+# Particle system backed by NumPy arrays. Positions and speeds share one
+# fixed-layout float block; x, y and speed are row views into it.
+class ParticleSystem:
+    __slots__ = ("rng", "motion", "x", "y", "speed", "size", "sprites")
+
+    def __init__(self, count, sizes, speeds, colors, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.motion = np.empty((3, count))
+        self.x, self.y, self.speed = self.motion
+        self.x[:] = self.rng.integers(0, SCREEN_WIDTH, count, endpoint=True)
+        self.y[:] = self.rng.integers(0, SCREEN_HEIGHT, count, endpoint=True)
+        self.size = self.rng.integers(sizes[0], sizes[1], count, endpoint=True).astype(np.int16)
+        self.speed[:] = self.rng.uniform(speeds[0], speeds[1], count)
+        color_index = self.rng.integers(0, len(colors), count)
+
+        # One pre-rendered circle sprite per size and color
+        sprites = {}
+        for size in range(sizes[0], sizes[1] + 1):
+            for i, color in enumerate(colors):
+                sprite = pygame.Surface((size * 2 + 1, size * 2 + 1))
+                sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+                pygame.draw.circle(sprite, color, (size, size), size)
+                sprites[size, i] = sprite
+        self.sprites = [sprites[size, i] for size, i in zip(self.size.tolist(), color_index.tolist())]
+
+    def __len__(self):
+        return len(self.x)
+
+    def positions(self):
+        return self.x.astype(int) - self.size, self.y.astype(int) - self.size
+
+    def rects(self):
+        # Screen areas covered by each particle, clipped to the screen
+        left, top = self.positions()
+        side = self.size * 2 + 1
+        x0 = np.maximum(left, 0)
+        y0 = np.maximum(top, 0)
+        x1 = np.minimum(left + side, SCREEN_WIDTH)
+        y1 = np.minimum(top + side, SCREEN_HEIGHT)
+        boxes = np.column_stack((x0, y0, np.maximum(x1 - x0, 0), np.maximum(y1 - y0, 0)))
+        return [pygame.Rect(box) for box in boxes.tolist()]
+
+    def draw(self, surface):
+        left, top = self.positions()
+        surface.blits(zip(self.sprites, zip(left.tolist(), top.tolist())), doreturn=False)
+
+    def update(self):
+        self.y += self.speed
+        wrapped = self.y > SCREEN_HEIGHT
+        count = int(wrapped.sum())
+        if count:
+            self.y[wrapped] = 0
+            self.x[wrapped] = self.rng.integers(0, SCREEN_WIDTH, count, endpoint=True)
+
+# Typewriter text reveal. The full text is kept once and typing only
+# advances an integer cursor, so each update costs the same however long
+# the passage is. No content screen types its text yet.
+class Typewriter:
+    __slots__ = ("text", "cursor", "speed")
+
+    def __init__(self, speed=2):
+        self.text = ""
+        self.cursor = 0
+        self.speed = speed
+
+    @property
+    def typing(self):
+        return self.cursor < len(self.text)
+
+    def start(self, text):
+        self.text = text
+        self.cursor = 0
+
+    def update(self):
+        if self.typing:
+            self.cursor = min(len(self.text), self.cursor + self.speed)
+
+class GameState(GameSession):
+    __slots__ = ("seed", "typewriter", "particles", "void_particles")
+
+    def __init__(self, seed=None):
+        super().__init__(history=True)
+        # One seed drives every particle system, so recordings replay exactly
+        self.seed = seed
+        self.typewriter = Typewriter()
+        self.particles = ParticleSystem(MENU_PARTICLE_COUNT, (1, 3), (0.2, 1.0), [(100, 80, 120)], seed)
         
-        self.sanity = 100
-        self.void_scenario = 1
         void_colors = [(30, 10, 40), (40, 15, 50), (50, 20, 60)]
-        self.void_particles = []
-        for _ in range(30):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            size = random.randint(1, 4)
-            speed = random.uniform(0.5, 2.0)
-            color = random.choice(void_colors)
-            self.void_particles.append([x, y, size, speed, color])
-        
-        for _ in range(50):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT)
-            size = random.randint(1, 3)
-            speed = random.uniform(0.2, 1.0)
-            self.particles.append([x, y, size, speed])
+        void_seed = None if seed is None else seed + 1
+        self.void_particles = ParticleSystem(VOID_PARTICLE_COUNT, (1, 4), (0.5, 2.0), void_colors, void_seed)
+
+    @property
+    def typing(self):
+        return self.typewriter.typing
 
     def start_typing(self, text):
-        self.text_queue = text.split(" ")
-        self.current_text = ""
-        self.text_progress = 0
-        self.typing = True
+        self.typewriter.start(text)
 
     def update_typing(self):
-        if self.typing and self.text_queue:
-            if self.text_progress >= len(self.text_queue[0]):
-                self.current_text += self.text_queue.pop(0) + " "
-                self.text_progress = 0
-            else:
-                self.text_progress += self.text_speed
-        elif not self.text_queue:
-            self.typing = False
-
-    def get_visible_text(self):
-        if not self.text_queue:
-            return self.current_text
-        return self.current_text + self.text_queue[0][:int(self.text_progress)]
-    
-    def calculate_alignment(self):
-        role_profile = self.role_profiles[self.player_role]
-        alignment_score = 0
-        
-        for trait, value in self.choices.items():
-            difference = abs(value - role_profile.get(trait, 0))
-            alignment_score += (3 - difference)
-        
-        max_possible = 12
-        return (alignment_score / max_possible) * 100
-
-# Create game state
-game_state = GameState()
+        self.typewriter.update()
 
 # Button class
 class Button:
+    __slots__ = ("rect", "text", "action", "key", "hovered", "dirty", "color", "hover_color", "surfaces")
+
     def __init__(self, x, y, width, height, text, color=BUTTON_COLOR, hover_color=BUTTON_HOVER, action=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.action = action
+        # Keyboard shortcut, if any
+        self.key = None
         self.hovered = False
+        # Set whenever the button needs to be repainted
+        self.dirty = True
         # Ensure colors are tuples
         self.color = tuple(color) if hasattr(color, '__iter__') else BUTTON_COLOR
         self.hover_color = tuple(hover_color) if hasattr(hover_color, '__iter__') else BUTTON_HOVER
         
-    def draw(self, surface):
-        color = tuple(self.hover_color) if self.hovered else tuple(self.color)
-        pygame.draw.rect(surface, color, self.rect)
-        pygame.draw.rect(surface, tuple(HIGHLIGHT), self.rect, 3)
+        # Pre-render the normal and hover faces once
+        # Indexed by self.hovered
+        self.surfaces = (self.render(self.color), self.render(self.hover_color))
+        
+    def render(self, color):
+        surface = pygame.Surface(self.rect.size)
+        surface.fill(color)
+        pygame.draw.rect(surface, HIGHLIGHT, surface.get_rect(), 3)
         
-        text_surf = text_font.render(self.text, True, tuple(TEXT_COLOR))
-        text_rect = text_surf.get_rect(center=self.rect.center)
+        text_surf = text_cache.render(text_font, self.text, TEXT_COLOR)
+        text_rect = text_surf.get_rect(center=surface.get_rect().center)
         surface.blit(text_surf, text_rect)
+        return surface
         
-    def update(self, mouse_pos):
-        self.hovered = self.rect.collidepoint(mouse_pos)
+    def draw(self, surface):
+        surface.blit(self.surfaces[self.hovered], self.rect)
+        self.dirty = False
         
+    def update(self, mouse_pos):
+        hovered = bool(self.rect.collidepoint(mouse_pos))
+        if hovered != self.hovered:
+            self.hovered = hovered
+            self.dirty = True
+
+# Screen-scoped widget registry
+class WidgetRegistry:
+    def __init__(self):
+        self.buttons = []
+        # Hit-test and shortcut tables for the current screen
+        self.rects = []
+        self.keys = {}
+
+    def enter(self, create, *args):
+        # Widgets are built once when a screen is entered and reused after that
+        self.buttons = create(*args) if create else []
+        self.rects = [button.rect for button in self.buttons]
+        self.keys = {button.key: button for button in self.buttons if button.key}
+
+    def exit(self):
+        self.buttons = []
+        self.rects = []
+        self.keys = {}
+
+    def hit(self, pos):
+        index = pygame.Rect(pos, (1, 1)).collidelist(self.rects)
+        return self.buttons[index] if index != -1 else None
+
     def handle_event(self, event):
-        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.hovered:
-            if self.action:
-                self.action()
+        # Clicks are hit-tested at their own position rather than against
+        # the hover state of the last drawn frame
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            button = self.hit(event.pos)
+        elif event.type == pygame.KEYDOWN:
+            button = self.keys.get(event.key)
+        else:
+            return False
+        if button is None:
+            return False
+        if button.action:
+            button.action()
+        return True
+
+widgets = WidgetRegistry()
+
+# Static screen layers
+class StaticLayerCache:
+    def __init__(self, max_layers=8):
+        self.max_layers = max_layers
+        self.layers = OrderedDict()
+
+    def get(self, key, build):
+        layer = self.layers.get(key)
+        if layer is not None:
+            self.layers.move_to_end(key)
+            return layer
+
+        # Static content is composited once onto a transparent layer so
+        # particles can still be drawn underneath it
+        layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        build(layer)
+        self.layers[key] = layer
+        if len(self.layers) > self.max_layers:
+            self.layers.popitem(last=False)
+        return layer
+
+    def clear(self):
+        self.layers.clear()
+
+# Dirty-rectangle frame renderer
+class FrameRenderer:
+    def __init__(self, surface):
+        self.surface = surface
+        self.layers = StaticLayerCache()
+        self.layer_key = None
+        self.particle_rects = []
+        self.dirty_rects = []
+        self.full_redraw = True
+        self.animating = False
+        # Drawn over the finished frame and erased again on the next one
+        self.overlay_rects = []
+        # Past this many particle rects a full repaint is cheaper
+        self.max_dirty_rects = 128
+        # Inputs of the last composed frame
+        self.pointer = None
+        self.buttons = None
+        self.skipped_frames = 0
+
+    def invalidate(self):
+        self.layer_key = None
+
+    def unchanged(self, key, pointer, buttons, particles=None):
+        # True when this frame would draw exactly what is already on screen
+        if (particles is None and not self.overlay_rects and key == self.layer_key
+                and pointer == self.pointer and buttons is self.buttons):
+            self.skipped_frames += 1
             return True
         return False
 
+    def pointer_moved(self, pointer, buttons):
+        return pointer != self.pointer or buttons is not self.buttons
+
+    def compose(self, key, build, buttons, particles=None, pointer=None):
+        surface = self.surface
+        layer = self.layers.get(key, build)
+        new_layer = key != self.layer_key
+
+        # Erase last frame's particles, or start over on a new layer
+        particle_rects = particles.rects() if particles else []
+        erase_rects = self.particle_rects + particle_rects + self.overlay_rects
+        self.overlay_rects = []
+        repaint = new_layer or len(erase_rects) > self.max_dirty_rects
+        if repaint:
+            surface.fill(BACKGROUND)
+            dirty_rects = []
+        else:
+            # Merge overlapping rects so the layer is blended only once per pixel
+            dirty_rects = merge_rects(erase_rects)
+            for rect in dirty_rects:
+                surface.fill(BACKGROUND, rect)
+
+        if particles:
+            particles.draw(surface)
+            particles.update()
+
+        # Put static content back on top of the particles
+        if repaint:
+            surface.blit(layer, (0, 0))
+        else:
+            for rect in dirty_rects:
+                surface.blit(layer, rect, rect)
+
+        # Only repaint buttons whose hover changed or that were drawn over
+        for btn in buttons:
+            if repaint or btn.dirty or btn.rect.collidelist(dirty_rects) != -1:
+                btn.draw(surface)
+                dirty_rects.append(btn.rect)
+
+        self.layer_key = key
+        self.pointer = pointer
+        self.buttons = buttons
+        self.particle_rects = particle_rects
+        self.animating = bool(particles)
+        self.full_redraw = self.full_redraw or repaint
+        self.dirty_rects.extend(dirty_rects)
+
+    def overlay(self, image, position):
+        rect = self.surface.blit(image, position)
+        self.overlay_rects.append(rect)
+        self.dirty_rects.append(rect)
+
+    def present(self):
+        if self.full_redraw:
+            pygame.display.flip()
+        elif self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        self.dirty_rects = []
+        self.full_redraw = False
+
+# Collapse overlapping rects into their bounding rects
+def merge_rects(rects):
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+# Screen transitions. The outgoing frame is kept when the screen changes
+# and the incoming one after the new screen's first draw; every other
+# transition frame only blends those two snapshots, so neither screen's
+# draw runs again until the transition ends.
+TRANSITION_FRAMES = {"crossfade": 12, "fade": 20, "void": 24}
+VOID_TINT = (48, 12, 72)
+VOID_BAND_HEIGHT = 16
+VOID_SHIFT = 48
+
+def transition_kind(old_id, new_id):
+    if new_id.startswith("void"):
+        return "void"
+    if "main_menu" in (old_id, new_id):
+        return "fade"
+    return "crossfade"
+
+class TransitionCompositor:
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.enabled = True
+        self.kind = None
+        self.frame = 0
+        self.frames = 0
+        # Progress of a fade through black: alpha of the visible screen and
+        # -1 while the old one fades out, 1 while the new one fades in
+        self.fade_alpha = 255
+        self.fade_direction = 1
+        # Snapshots and the tint are allocated once and reused
+        surface = renderer.surface
+        self.outgoing = surface.copy()
+        self.incoming = surface.copy()
+        self.tint = pygame.Surface(surface.get_size()).convert()
+        self.tint.fill(VOID_TINT)
+        # Row bands of the void distortion, each with its own phase
+        width, height = surface.get_size()
+        self.band_rects = [pygame.Rect(0, y, width, VOID_BAND_HEIGHT)
+                           for y in range(0, height, VOID_BAND_HEIGHT)]
+        self.band_rows = np.arange(0, height, VOID_BAND_HEIGHT)
+        self.band_phases = self.band_rows * 0.05
+
+    @property
+    def active(self):
+        return self.kind is not None
+
+    def start(self, kind):
+        if not self.enabled:
+            return
+        # The display still holds the last frame of the old screen
+        self.outgoing.blit(self.renderer.surface, (0, 0))
+        self.kind = kind
+        self.frame = 0
+        self.frames = TRANSITION_FRAMES[kind]
+
+    def draw(self, draw_screen):
+        surface = self.renderer.surface
+        if self.frame == 0:
+            draw_screen()
+            self.incoming.blit(surface, (0, 0))
+        progress = self.frame / self.frames
+        if self.kind == "crossfade":
+            surface.blit(self.outgoing, (0, 0))
+            self.blend(self.incoming, int(255 * progress))
+        elif self.kind == "fade":
+            self.fade_direction = -1 if progress < 0.5 else 1
+            self.fade_alpha = int(255 * abs(progress * 2 - 1))
+            surface.fill((0, 0, 0))
+            self.blend(self.outgoing if self.fade_direction < 0 else self.incoming, self.fade_alpha)
+        else:
+            self.distort(progress)
+        # Transition frames change the whole screen
+        self.renderer.full_redraw = True
+        self.frame += 1
+        if self.frame > self.frames:
+            self.kind = None
+            # The next frame repaints the screen from its layers
+            self.renderer.invalidate()
+
+    def blend(self, snapshot, alpha):
+        # A full alpha needs no blending, so it takes the plain copy path
+        if alpha < 255:
+            snapshot.set_alpha(alpha)
+        self.renderer.surface.blit(snapshot, (0, 0))
+        snapshot.set_alpha(None)
+
+    def distort(self, progress):
+        # Bands of rows slide sideways, strongest halfway through, where
+        # the old screen is swapped for the new one under the tint
+        surface = self.renderer.surface
+        strength = math.sin(math.pi * progress)
+        source = self.outgoing if progress < 0.5 else self.incoming
+        shifts = (VOID_SHIFT * strength * np.sin(self.band_phases + progress * 4 * math.pi)).astype(int)
+        surface.fill(BACKGROUND)
+        surface.blits([(source, (int(x), int(y)), rect)
+                       for x, y, rect in zip(shifts, self.band_rows, self.band_rects)], doreturn=False)
+        self.tint.set_alpha(int(160 * strength))
+        surface.blit(self.tint, (0, 0))
+
+# Adaptive frame scheduler
+class FrameScheduler:
+    def __init__(self, fps=FPS, idle_timeout=1000):
+        self.fps = fps
+        self.idle_timeout = idle_timeout
+        self.clock = pygame.time.Clock()
+
+    def next_events(self, animating, fps=None):
+        self.clock.tick(fps or self.fps)
+        if animating:
+            return pygame.event.get()
+        
+        # Nothing is moving, so sleep until input arrives
+        event = pygame.event.wait(self.idle_timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+        return events
+
+# Event types the game reads; SDL drops everything else before it is queued
+INPUT_EVENTS = [pygame.QUIT, pygame.WINDOWEXPOSED, pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN]
+
+# Choice buttons answer to A, B and C in order; Esc goes back to the menu
+# and Backspace takes back the last choice
+CHOICE_KEYS = (pygame.K_a, pygame.K_b, pygame.K_c)
+
+def coalesce_motion(events):
+    # Hover is read from the pointer position, so a run of MOUSEMOTION
+    # events only needs its last one
+    coalesced = []
+    for event in events:
+        if event.type == pygame.MOUSEMOTION and coalesced and coalesced[-1].type == pygame.MOUSEMOTION:
+            coalesced[-1] = event
+        else:
+            coalesced.append(event)
+    return coalesced
+
+# Input comes from the window, or from a recording during replay
+class LiveInput:
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler
+
+    def mouse_position(self):
+        return pygame.mouse.get_pos()
+
+    def events(self, animating, fps=None):
+        return self.scheduler.next_events(animating, fps)
+
+input_source = LiveInput()
+
+# Frame profiler overlay, toggled with F3
+class ProfilerOverlay:
+    def __init__(self, profiler, refresh=30):
+        self.profiler = profiler
+        self.visible = False
+        # Frames between redraws of the numbers
+        self.refresh = refresh
+        self.frames = 0
+        self.image = None
+        self.was_enabled = False
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.was_enabled = self.profiler.enabled
+            self.profiler.enable()
+            self.frames = 0
+        elif not self.was_enabled:
+            self.profiler.disable()
+
+    def render(self, screen_id):
+        rows = [("phase", "p50", "p95", "p99")]
+        for row in self.profiler.summary([screen_id]):
+            rows.append((row["phase"], *(f"{row[key]:.2f}" for key in ("p50_ms", "p95_ms", "p99_ms"))))
+        
+        # Rendered directly: the numbers change too often for the text cache
+        font = small_font.load()
+        line_height = font.get_linesize()
+        label_width = max(font.size(row[0])[0] for row in rows + [(screen_id,)]) + 20
+        column_width = font.size("000.00")[0] + 15
+        image = pygame.Surface((label_width + column_width * 3 + 20, line_height * (len(rows) + 1) + 20),
+                               pygame.SRCALPHA)
+        image.fill((0, 0, 0, 190))
+        image.blit(font.render(f"{screen_id} (ms)", True, HIGHLIGHT), (10, 10))
+        for i, row in enumerate(rows):
+            y = 10 + (i + 1) * line_height
+            image.blit(font.render(row[0], True, TEXT_COLOR), (10, y))
+            for j, cell in enumerate(row[1:]):
+                # Right-align the numbers in fixed columns
+                text = font.render(cell, True, TEXT_COLOR)
+                image.blit(text, (10 + label_width + (j + 1) * column_width - text.get_width(), y))
+        return image
+
+    def draw(self, screen_id):
+        if self.frames % self.refresh == 0:
+            self.image = self.render(screen_id)
+        self.frames += 1
+        renderer.overlay(self.image, (SCREEN_WIDTH - self.image.get_width() - 10, 10))
+
+profiler = FrameProfiler()
+profiler_overlay = ProfilerOverlay(profiler)
+
 # Game selection functions
 def select_aetherian():
-    game_state.current_screen = "aetherian_intro"
+    screens.switch("aetherian_intro")
 
 def select_chronos():
-    game_state.current_screen = "chronos_intro"
+    screens.switch("chronos_intro")
 
 def select_void():
-    game_state.current_screen = "void_intro"
+    screens.switch("void_intro")
 
 def return_to_menu():
-    game_state.current_screen = "main_menu"
     # Reset game states
-    game_state.player_role = None
-    game_state.scenarios_completed = 0
-    game_state.choices = {"Honor": 0, "Pragmatism": 0, "Curiosity": 0}
-    game_state.time_era = "present"
-    game_state.timeline_integrity = 100
-    game_state.chronos_choices = {"Preservation": 0, "Intervention": 0, "Knowledge": 0}
-    game_state.chronos_scenario = 1
-    game_state.sanity = 100
-    game_state.void_scenario = 1
+    game_state.reset()
+    screens.switch("main_menu")
 
-# Aetherian Gauntlet functions
-def select_warrior():
-    game_state.player_role = "Warrior"
-    game_state.current_screen = "aetherian_scenario_1"
+def enter_screen(screen_id):
+    screens.switch(screen_id)
 
-def select_mage():
-    game_state.player_role = "Mage"
-    game_state.current_screen = "aetherian_scenario_1"
+# Choices and endings go to telemetry when it is on; record() never blocks
+def log_event(kind, **fields):
+    if telemetry is not None:
+        telemetry.record(kind, **fields)
 
-def select_rogue():
-    game_state.player_role = "Rogue"
-    game_state.current_screen = "aetherian_scenario_1"
+# Takes back the last choice, from a scenario or an ending screen
+def undo_choice():
+    if game_state.undo():
+        log_event("undo", screen=game_state.current_screen, step=game_state.steps())
+        screens.switch(game_state.current_screen)
+
+# Aetherian Gauntlet functions
+def select_role(role):
+    game_state.select_role(role)
+    screens.switch(game_state.current_screen)
 
 def make_choice(choice):
-    scenario_num = game_state.scenarios_completed + 1
-    values = game_state.scenario_values[scenario_num][choice]
-    for trait, value in values.items():
-        game_state.choices[trait] += value
-    
-    game_state.scenarios_completed += 1
-    
-    if game_state.scenarios_completed < 4:
-        game_state.current_screen = f"aetherian_scenario_{game_state.scenarios_completed + 1}"
-    else:
-        game_state.current_screen = "aetherian_judgment"
+    scenario = game_state.scenarios_completed + 1
+    game_state.make_choice(choice)
+    log_event("choice", game="aetherian", role=game_state.player_role, scenario=scenario, choice=choice)
+    if game_state.current_screen == "aetherian_judgment":
+        log_event("ending", game="aetherian", role=game_state.player_role, ending=game_state.aetherian_ending(),
+                  alignment=round(game_state.calculate_alignment(), 1))
+    screens.switch(game_state.current_screen)
 
 # Chronos Legacy functions
 def chronos_make_choice(choice):
-    if choice == "preserve":
-        game_state.chronos_choices["Preservation"] += 1
-        game_state.timeline_integrity = min(100, game_state.timeline_integrity + 5)
-    elif choice == "intervene":
-        game_state.chronos_choices["Intervention"] += 1
-        game_state.timeline_integrity = max(0, game_state.timeline_integrity - 10)
-    elif choice == "knowledge":
-        game_state.chronos_choices["Knowledge"] += 1
-    
-    game_state.chronos_scenario += 1
-    
-    if game_state.chronos_scenario <= 3:
-        if game_state.time_era == "present":
-            game_state.time_era = "past"
-        elif game_state.time_era == "past":
-            game_state.time_era = "future"
-        game_state.current_screen = "chronos_scenario_1"
-    else:
-        game_state.current_screen = "chronos_ending"
+    scenario = game_state.chronos_scenario
+    game_state.chronos_make_choice(choice)
+    log_event("choice", game="chronos", scenario=scenario, choice=choice,
+              timeline_integrity=game_state.timeline_integrity)
+    if game_state.current_screen == "chronos_ending":
+        log_event("ending", game="chronos", ending=game_state.chronos_ending(),
+                  timeline_integrity=game_state.timeline_integrity)
+    screens.switch(game_state.current_screen)
 
 # Echoes of the Void functions
 def void_make_choice(choice):
-    if choice == "destroy":
-        game_state.sanity = min(100, game_state.sanity + 10)
-    elif choice == "use":
-        game_state.sanity = max(0, game_state.sanity - 20)
-    elif choice == "study":
-        game_state.sanity = max(0, game_state.sanity - 5)
-    
-    game_state.void_scenario += 1
-    
-    if game_state.void_scenario <= 4:
-        game_state.current_screen = f"void_scenario_{game_state.void_scenario}"
-    else:
-        if game_state.sanity <= 30:
-            game_state.current_screen = "void_ending_madness"
-        elif game_state.sanity >= 80:
-            game_state.current_screen = "void_ending_safe"
-        else:
-            game_state.current_screen = "void_ending_mixed"
-
-# Draw functions for each screen
-def draw_main_menu():
-    # Draw background
-    screen.fill(BACKGROUND)
-    
-    # Draw particles
-    for particle in game_state.particles:
-        x, y, size, speed = particle
-        pygame.draw.circle(screen, (100, 80, 120), (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw title
-    title_text = title_font.render("RPG GAME COLLECTION", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 80))
-    
-    subtitle_text = heading_font.render("Choose Your Adventure", True, TEXT_COLOR)
-    screen.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, 150))
-    
-    # Draw game selection buttons
-    button_width, button_height = 600, 120
-    button_y_start = 250
-    button_spacing = 150
-    
-    aetherian_btn = Button(
-        SCREEN_WIDTH//2 - button_width//2, 
-        button_y_start, 
-        button_width, 
-        button_height, 
-        "Aetherian Gauntlet: Role-Based Adventure", 
-        AETHERIAN_COLOR,
-        (210, 70, 70),
-        select_aetherian
-    )
-    
-    chronos_btn = Button(
-        SCREEN_WIDTH//2 - button_width//2, 
-        button_y_start + button_spacing, 
-        button_width, 
-        button_height, 
-        "Chronos Legacy: Time Manipulation Adventure", 
-        CHRONOS_COLOR,
-        (70, 130, 210),
-        select_chronos
-    )
-    
-    void_btn = Button(
-        SCREEN_WIDTH//2 - button_width//2, 
-        button_y_start + button_spacing * 2, 
-        button_width, 
-        button_height, 
-        "Echoes of the Void: Cosmic Horror Mystery", 
-        VOID_COLOR,
-        (110, 50, 130),
-        select_void
-    )
-    
-    # Draw game descriptions
-    descriptions = [
-        "A choice-driven RPG where your decisions determine your alignment with your chosen role",
-        "Manipulate time across different eras in this narrative adventure with branching timelines",
-        "Investigate cosmic horrors in this psychological thriller with sanity mechanics"
-    ]
-    
-    for i, desc in enumerate(descriptions):
-        text = small_font.render(desc, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 
-                          button_y_start + button_height + 10 + i * button_spacing))
-    
-    mouse_pos = pygame.mouse.get_pos()
-    buttons = [aetherian_btn, chronos_btn, void_btn]
-    
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    # Draw footer
-    footer_text = small_font.render("Select a game to begin your adventure...", True, TEXT_COLOR)
-    screen.blit(footer_text, (SCREEN_WIDTH//2 - footer_text.get_width()//2, SCREEN_HEIGHT - 50))
-    
-    return buttons
-
-def draw_aetherian_intro():
-    screen.fill(BACKGROUND)
-    
-    # Draw particles
-    for particle in game_state.particles:
-        x, y, size, speed = particle
-        pygame.draw.circle(screen, (100, 80, 120), (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw title
-    title_text = title_font.render("AETHERIAN GAUNTLET", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-    
-    subtitle_text = heading_font.render("A Role-Based Adventure", True, TEXT_COLOR)
-    screen.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, 180))
-    
-    # Draw introduction text
-    intro_lines = [
-        "You wake in a cold, stone cell. The roar of a",
-        "distant crowd shakes dust from the ceiling.",
-        "",
-        "A grizzled guard slides a meal through the bars.",
-        "'Eat up, rookie,' he grunts. 'The Proving Grounds",
-        "await. What's your specialty? Don't lie to yourself.",
-        "It's the only thing that'll keep you alive out there.'"
-    ]
-    
-    for i, line in enumerate(intro_lines):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 250 + i*40))
-    
-    # Draw role selection buttons with auto-sizing
-    warrior_text = "Choose Warrior - Path of Strength"
-    mage_text = "Choose Mage - Path of Knowledge"
-    rogue_text = "Choose Rogue - Path of Cunning"
-    
-    warrior_width = text_font.size(warrior_text)[0] + 40
-    mage_width = text_font.size(mage_text)[0] + 40
-    rogue_width = text_font.size(rogue_text)[0] + 40
-    
-    warrior_btn = Button(SCREEN_WIDTH//2 - warrior_width//2, 550, warrior_width, 50, warrior_text, 
-                    tuple(AETHERIAN_COLOR), (210, 70, 70), select_warrior)
-    mage_btn = Button(SCREEN_WIDTH//2 - mage_width//2, 620, mage_width, 50, mage_text, 
-                 tuple(MAGE_COLOR), (70, 130, 210), select_mage)
-    rogue_btn = Button(SCREEN_WIDTH//2 - rogue_width//2, 700, rogue_width, 50, rogue_text, 
-                  tuple(ROGUE_COLOR), (70, 180, 70), select_rogue)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    buttons = [warrior_btn, mage_btn, rogue_btn, back_btn]
-    
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_aetherian_scenario_1():
-    screen.fill(BACKGROUND)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 1: The Wounded Beast", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario text
-    scenario_text = [
-        "Your first fight is against a chained Wolf-Hyena.",
-        "You defeat it, but it's wounded, not dead.",
-        "It whimpers, cowering before you. The crowd awaits your decision."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 140 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Finish it quickly and mercifully",
-        "B. Leave it alive as a distraction for the next gladiator",
-        "C. Spare it to have the arena alchemists examine it"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 300 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    for i, choice in enumerate(choices):
-        btn = Button(SCREEN_WIDTH//2 - 100, 450 + i*60, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=lambda c=choice: make_choice(c))
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_aetherian_scenario_2():
-    screen.fill(BACKGROUND)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 2: The Rival", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario image (placeholder)
-    pygame.draw.rect(screen, (50, 40, 60), (SCREEN_WIDTH//2 - 300, 120, 600, 200))
-    pygame.draw.rect(screen, (120, 100, 140), (SCREEN_WIDTH//2 - 300, 120, 600, 200), 3)
-    
-    # Draw scenario text
-    scenario_text = [
-        "A gladiator from your same role has become your rival.",
-        "Before a crucial team battle, they offer you a proposal",
-        "to work together."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 340 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Refuse. You will defeat them fairly in the arena",
-        "B. Accept, but plan to betray them during the match",
-        "C. Accept and propose a genuine combo move"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 480 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    for i, choice in enumerate(choices):
-        btn = Button(SCREEN_WIDTH//2 - 100, 600 + i*60, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=lambda c=choice: make_choice(c))
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_aetherian_scenario_3():
-    screen.fill(BACKGROUND)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 3: The Corrupt Guard", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario image (placeholder)
-    pygame.draw.rect(screen, (50, 40, 60), (SCREEN_WIDTH//2 - 300, 120, 600, 200))
-    pygame.draw.rect(screen, (120, 100, 140), (SCREEN_WIDTH//2 - 300, 120, 600, 200), 3)
-    
-    # Draw scenario text
-    scenario_text = [
-        "A guard approaches you with an offer: he can make",
-        "your next fight easier in exchange for a share of",
-        "your winnings. This is strictly against arena rules."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 340 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Refuse and report the guard to authorities",
-        "B. Accept the offer without hesitation",
-        "C. Pretend to accept, but gather evidence to blackmail him"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 480 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    for i, choice in enumerate(choices):
-        btn = Button(SCREEN_WIDTH//2 - 100, 600 + i*60, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=lambda c=choice: make_choice(c))
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_aetherian_scenario_4():
-    screen.fill(BACKGROUND)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 4: The Dark Secret", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario image (placeholder)
-    pygame.draw.rect(screen, (50, 40, 60), (SCREEN_WIDTH//2 - 300, 120, 600, 200))
-    pygame.draw.rect(screen, (120, 100, 140), (SCREEN_WIDTH//2 - 300, 120, 600, 200), 3)
-    
-    # Draw scenario text
-    scenario_text = [
-        "You overhear the Arena Master plotting to assassinate",
-        "the benevolent Emperor. He plans to use the chaos of",
-        "the games as a cover for his treachery."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 340 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Confront the Arena Master to protect the realm",
-        "B. Use the distraction to escape the arena forever",
-        "C. Blackmail the Arena Master for your freedom and power"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 480 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    for i, choice in enumerate(choices):
-        btn = Button(SCREEN_WIDTH//2 - 100, 600 + i*60, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=lambda c=choice: make_choice(c))
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_aetherian_judgment():
-    screen.fill(BACKGROUND)
-    
-    # Calculate alignment
-    alignment_percent = game_state.calculate_alignment()
-    
-    # Draw judgment title
-    title_text = heading_font.render("Final Judgment", True, HIGHLIGHT)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw spectral judge image (placeholder)
-    pygame.draw.circle(screen, (70, 60, 90), (SCREEN_WIDTH//2, 200), 80)
-    pygame.draw.circle(screen, (180, 170, 190), (SCREEN_WIDTH//2, 200), 80, 3)
-    
-    # Draw alignment meter first
-    meter_width = 600
-    meter_y = 320
-    pygame.draw.rect(screen, (50, 50, 50), (SCREEN_WIDTH//2 - meter_width//2, meter_y, meter_width, 20))
-    pygame.draw.rect(screen, HIGHLIGHT, (SCREEN_WIDTH//2 - meter_width//2, meter_y, meter_width * (alignment_percent/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (SCREEN_WIDTH//2 - meter_width//2, meter_y, meter_width, 20), 2)
-    
-    percent_text = text_font.render(f"Alignment with {game_state.player_role} path: {alignment_percent:.1f}%", True, TEXT_COLOR)
-    screen.blit(percent_text, (SCREEN_WIDTH//2 - percent_text.get_width()//2, meter_y + 30))
-    
-    # Draw judgment text
-    if alignment_percent >= 70:
-        judgment_text = [
-            "The spectral Judge appears before you:",
-            "",
-            "'You have walked your chosen path without deviation.",
-            "Your nature is pure. You are not a prisoner of the",
-            "arena; you are its embodiment. You are free, and",
-            "your name shall be etched among the true Adepts.'"
-        ]
-        
-        title_map = {
-            "Warrior": "The Honorable Blade",
-            "Mage": "The Arcane Prodigy",
-            "Rogue": "The Whispering Shadow"
-        }
-        title = title_map[game_state.player_role]
-        
-        result_text = [
-            f"You are hailed as the ideal {game_state.player_role}.",
-            f"Your story becomes legend. You are now known as {title}!"
-        ]
-    else:
-        judgment_text = [
-            "The spectral Judge appears before you:",
-            "",
-            "'Power you sought, and power you gained.",
-            "But you lost yourself in the process. You wield",
-            "your skills without true understanding of their",
-            "nature. You are powerful... but you are an Aberration.'"
-        ]
-        
-        title_map = {
-            "Warrior": "The Oathbreaker",
-            "Mage": "The Mad Scholar",
-            "Rogue": "The Unpredictable"
-        }
-        title = title_map[game_state.player_role]
-        
-        result_text = [
-            "You are granted freedom, but you are shunned.",
-            f"You are a cautionary tale. You are now known as {title}!"
-        ]
-    
-    # Draw judgment text
-    for i, line in enumerate(judgment_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 380 + i*25))
-    
-    # Draw result text
-    for i, line in enumerate(result_text):
-        text = heading_font.render(line, True, HIGHLIGHT)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 550 + i*35))
-    
-    # Draw restart button
-    restart_btn = Button(SCREEN_WIDTH//2 - 100, 650, 200, 50, "Play Again", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    mouse_pos = pygame.mouse.get_pos()
-    restart_btn.update(mouse_pos)
-    restart_btn.draw(screen)
-    
-    return [restart_btn]
-
-# Chronos Legacy screens
-def draw_chronos_intro():
-    screen.fill(BACKGROUND)
-    
-    # Draw title
-    title_text = title_font.render("CHRONOS LEGACY", True, CHRONOS_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-    
-    subtitle_text = heading_font.render("A Time Manipulation Adventure", True, TEXT_COLOR)
-    screen.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, 180))
-    
-    # Draw intro text
-    intro_lines = [
-        "You awaken as a Time Weaver, part of an ancient order",
-        "that maintains the flow of time. The Timeless Library",
-        "has been corrupted, causing temporal rifts across history.",
-        "Your mentor is missing. You must journey through different",
-        "eras to restore balance before reality unravels completely."
-    ]
-    
-    for i, line in enumerate(intro_lines):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 250 + i*40))
-    
-    # Draw start button
-    start_btn = Button(SCREEN_WIDTH//2 - 100, 500, 200, 50, "Begin Journey", CHRONOS_COLOR, (70, 130, 210), 
-                      lambda: setattr(game_state, 'current_screen', 'chronos_scenario_1'))
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    buttons = [start_btn, back_btn]
-    
+    scenario = game_state.void_scenario
+    game_state.void_make_choice(choice)
+    log_event("choice", game="void", scenario=scenario, choice=choice, sanity=game_state.sanity)
+    if game_state.void_scenario > VOID_SCENARIOS:
+        log_event("ending", game="void", ending=game_state.void_ending(), sanity=game_state.sanity)
+    screens.switch(game_state.current_screen)
+
+def update_buttons(buttons, mouse_pos):
     for btn in buttons:
         btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
 
-def draw_chronos_scenario_1():
-    screen.fill(BACKGROUND)
-    
-    # Draw era indicator
-    era_text = heading_font.render(f"Current Era: {game_state.time_era.capitalize()}", True, CHRONOS_COLOR)
-    screen.blit(era_text, (SCREEN_WIDTH//2 - era_text.get_width()//2, 50))
-    
-    # Draw timeline integrity meter with frame
-    integrity_text = text_font.render(f"Timeline Integrity: {game_state.timeline_integrity}%", True, TEXT_COLOR)
-    screen.blit(integrity_text, (50, 100))
-    
-    meter_width = 200
-    pygame.draw.rect(screen, (30, 30, 30), (50, 130, meter_width, 20))
-    pygame.draw.rect(screen, CHRONOS_COLOR, (50, 130, meter_width * (game_state.timeline_integrity/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (50, 130, meter_width, 20), 2)
-    
-    # Draw scenario
-    if game_state.time_era == "present":
-        scenario_text = [
-            "You discover a temporal rift in your present time.",
-            "A historian is about to destroy an ancient artifact",
-            "that he believes is dangerous, but you know it's",
-            "essential for maintaining the timeline balance."
-        ]
-        
-        choice_text = [
-            "A. Preserve the timeline - stop the historian",
-            "B. Intervene - let him destroy the artifact",
-            "C. Study the artifact first before deciding"
-        ]
-    elif game_state.time_era == "past":
-        scenario_text = [
-            "You travel to ancient Egypt. A priest is about to",
-            "erase knowledge of mathematics from the records,",
-            "fearing it gives too much power to common people."
-        ]
+# Names the content pack uses for button actions and particle systems;
+# state fields and variants are shared with scenario_pack
+ACTIONS = {
+    "select_aetherian": select_aetherian,
+    "select_chronos": select_chronos,
+    "select_void": select_void,
+    "return_to_menu": return_to_menu,
+    "enter": enter_screen,
+    "select_role": select_role,
+    "make_choice": make_choice,
+    "chronos_make_choice": chronos_make_choice,
+    "void_make_choice": void_make_choice
+}
+
+PARTICLE_SOURCES = {
+    "menu": lambda: game_state.particles,
+    "void": lambda: game_state.void_particles
+}
+
+def content_action(action):
+    # "make_choice:A" calls make_choice("A")
+    name, _, argument = action.partition(":")
+    if name not in ACTIONS:
+        raise ValueError(f"Unknown content action: {action}")
+    if argument:
+        return partial(ACTIONS[name], argument)
+    return ACTIONS[name]
+
+# Generic renderer for compiled screen content
+def draw_content(surface, elements, values, variant_elements=()):
+    for element in elements:
+        kind = element[0]
+        if kind == "text":
+            _, font_name, color, lines = element
+            font = FONTS[font_name]
+            for x, y, line, template in lines:
+                if template:
+                    text = text_cache.render(font, line.format(**values), color)
+                    if x < 0:
+                        x = SCREEN_WIDTH//2 - text.get_width()//2
+                else:
+                    # Static lines were measured and placed by the compiler
+                    text = text_cache.render(font, line, color)
+                surface.blit(text, (x, y))
+        elif kind == "rect":
+            _, color, rect, width = element
+            pygame.draw.rect(surface, color, rect, width)
+        elif kind == "circle":
+            _, color, center, radius, width = element
+            pygame.draw.circle(surface, color, center, radius, width)
+        elif kind == "meter":
+            _, field, (x, y, width, height), back, fill, frame, frame_width = element
+            pygame.draw.rect(surface, back, (x, y, width, height))
+            pygame.draw.rect(surface, fill, (x, y, width * (values[field]/100), height))
+            pygame.draw.rect(surface, frame, (x, y, width, height), frame_width)
+        elif kind == "variant":
+            draw_content(surface, variant_elements, values)
+
+# Screen registry
+class Screen:
+    def __init__(self, draw, create_buttons=None, *button_args, fps=None):
+        self.draw = draw
+        self.create_buttons = create_buttons
+        self.button_args = button_args
+        # Frame rate cap while the screen animates, defaults to FPS
+        self.fps = fps
+
+    def enter(self):
+        widgets.enter(self.create_buttons, *self.button_args)
+
+    def update(self):
+        game_state.update_typing()
+
+    def exit(self):
+        widgets.exit()
+
+# A screen described by the content pack
+class ContentScreen(Screen):
+    def __init__(self, screen_id, content):
+        particles, self.variant_source, self.elements, variants, self.button_specs, self.fields, fps = content
+        super().__init__(self.draw_screen, self.create_screen_buttons, fps=fps)
+        self.screen_id = screen_id
+        self.particles = PARTICLE_SOURCES[particles] if particles else None
+        self.variants = {}
+        for name, elements, lookups in variants:
+            self.variants[name] = (elements, [(field, key, dict(table)) for field, key, table in lookups])
+        self.variant = None
+        self.values = {}
+
+    def create_screen_buttons(self):
+        buttons = []
+        keys = iter(CHOICE_KEYS)
+        for rect, label, color, hover, action in self.button_specs:
+            button = Button(*rect, label, color, hover, content_action(action))
+            if action.partition(":")[0] in CHOICE_ACTIONS:
+                button.key = next(keys, None)
+            buttons.append(button)
+        return buttons
+
+    def build(self, surface):
+        values = dict(self.values)
+        variant_elements, lookups = self.variants.get(self.variant, ((), ()))
+        for field, key, table in lookups:
+            values[field] = table[values[key]]
+        draw_content(surface, self.elements, values, variant_elements)
+
+    def draw_screen(self):
+        buttons = widgets.buttons
+        pointer = input_source.mouse_position()
         
-        choice_text = [
-            "A. Preserve knowledge - stop the priest",
-            "B. Intervene - let him erase the knowledge",
-            "C. Study the mathematical texts first"
-        ]
-    else:  # future
-        scenario_text = [
-            "You arrive in a dystopian future where time has",
-            "broken down. The last survivors want to use a",
-            "dangerous time device to reset everything."
-        ]
+        # Screens that show game state are keyed on the values they show
+        self.values = {field: CONTENT_FIELDS[field](game_state) for field in self.fields}
+        self.variant = VARIANT_SOURCES[self.variant_source](game_state) if self.variant_source else None
+        layer_key = (self.screen_id, self.variant, tuple(self.values.values()))
+        particles = self.particles() if self.particles else None
+        if renderer.unchanged(layer_key, pointer, buttons, particles):
+            return buttons
         
-        choice_text = [
-            "A. Preserve the timeline - stop them from using the device",
-            "B. Intervene - let them reset time",
-            "C. Study the time device first"
-        ]
-    
-    # Draw scenario text
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*40))
-    
-    # Draw choices
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 350 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    actions = [
-        lambda: chronos_make_choice("preserve"),
-        lambda: chronos_make_choice("intervene"),
-        lambda: chronos_make_choice("knowledge")
-    ]
-    
-    for i, (choice, action) in enumerate(zip(choices, actions)):
-        btn = Button(SCREEN_WIDTH//2 - 100, 500 + i*70, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=action)
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
+        # Hover only changes when the pointer moves, and then only the
+        # buttons it left and entered are marked dirty
+        if renderer.pointer_moved(pointer, buttons):
+            update_buttons(buttons, pointer)
+        renderer.compose(layer_key, self.build, buttons, particles, pointer)
+        return buttons
+
+class ScreenRegistry:
+    def __init__(self, factory=None):
+        self.screens = {}
+        self.active = None
+        self.active_id = None
+        # Builds screens that were not registered up front
+        self.factory = factory
+
+    def register(self, screen_id, screen):
+        self.screens[screen_id] = screen
+
+    def get(self, screen_id):
+        screen = self.screens.get(screen_id)
+        if screen is None:
+            screen = self.screens[screen_id] = self.factory(screen_id)
+        return screen
+
+    def switch(self, screen_id):
+        if self.active is not None:
+            self.active.exit()
+            if transitions is not None:
+                transitions.start(transition_kind(self.active_id, screen_id))
+        game_state.current_screen = screen_id
+        self.active_id = screen_id
+        # Every choice, undo and return to the menu lands here; the save
+        # is encoded now and written off the frame loop
+        if autosaver is not None:
+            autosaver.save(game_state)
+        # Queues the assets of screens that can follow this one
+        assets.enter(screen_id)
+        self.active = self.get(screen_id)
+        self.active.enter()
+
+def content_screen(screen_id):
+    return ContentScreen(screen_id, content.screen(screen_id))
+
+screens = ScreenRegistry(content_screen)
+
+# Startup: only the display is initialized here. Assets load in the
+# background or on first use, and the mixer is never opened unless a
+# sound is loaded.
+def init(seed=None, transitions_enabled=True):
+    global screen, renderer, game_state, content, transitions
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("RPG Game Collection")
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(INPUT_EVENTS)
+    
+    renderer = FrameRenderer(screen)
+    transitions = TransitionCompositor(renderer)
+    transitions.enabled = transitions_enabled
+    content = load_pack()
+    game_state = GameState(seed)
+    # A new run starts from no screen, even when an earlier one left the
+    # registry on a screen (replay.py --repeat)
+    screens.active = screens.active_id = None
+    widgets.exit()
+    screens.switch(game_state.current_screen)
+
+# Picks up a saved run. A missing save starts a new game, and an
+# unreadable one is reported and ignored.
+def resume(path):
+    import savegame
+    try:
+        savegame.load(path, game_state)
+    except FileNotFoundError:
+        return
+    except (OSError, savegame.SaveError) as exc:
+        print(f"Could not load {path}: {exc}", file=sys.stderr)
+        game_state.reset()
+        return
+    if game_state.current_screen not in content:
+        print(f"Could not load {path}: unknown screen {game_state.current_screen}", file=sys.stderr)
+        game_state.reset()
+    screens.switch(game_state.current_screen)
 
-def draw_chronos_ending():
-    screen.fill(BACKGROUND)
-    
-    # Draw ending based on timeline integrity
-    if game_state.timeline_integrity >= 80:
-        title_text = heading_font.render("The Preserver of Time", True, CHRONOS_COLOR)
-        screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-        
-        ending_text = [
-            "You have successfully maintained the timeline,",
-            "preserving the flow of history without major disruptions.",
-            "The Temporal Council appoints you as the new Head Weaver,",
-            "entrusting you with the protection of all timelines."
-        ]
-    elif game_state.timeline_integrity >= 50:
-        title_text = heading_font.render("The Balanced Weaver", True, CHRONOS_COLOR)
-        screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
+# Main game loop
+def run(source=None, recorder=None):
+    global input_source
+    input_source = source or LiveInput(FrameScheduler())
+    running = True
+    
+    while running:
+        active_screen = screens.active
+        screen_id = game_state.current_screen
+        profiler.begin(screen_id)
+        pointer = input_source.mouse_position()
+        if transitions.active:
+            transitions.draw(active_screen.draw)
+        else:
+            active_screen.draw()
+        if profiler_overlay.visible:
+            profiler_overlay.draw(screen_id)
+        profiler.lap("draw")
+        renderer.present()
+        profiler.lap("present")
+        assets.start()
         
-        ending_text = [
-            "You managed to maintain a delicate balance in the timeline,",
-            "though some alterations remain. The Temporal Council",
-            "recognizes your efforts but places you under supervision",
-            "as you continue your training."
-        ]
-    else:
-        title_text = heading_font.render("The Timeline Breaker", True, CHRONOS_COLOR)
-        screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
+        # Run at full rate only while something is animating
+        animating = (renderer.animating or transitions.active or game_state.typing
+                     or profiler_overlay.visible)
+        # Transitions run at the full rate whatever the screen's cap
+        fps = None if transitions.active else active_screen.fps
+        events = coalesce_motion(input_source.events(animating, fps))
+        profiler.lap("wait")
+        if recorder:
+            recorder.frame(pointer, events)
         
-        ending_text = [
-            "Your actions have caused significant damage to the timeline,",
-            "creating multiple paradoxes and alternate realities.",
-            "The Temporal Council exiles you to a unstable timeline",
-            "where you must live with the consequences of your choices."
-        ]
-    
-    # Draw ending text
-    for i, line in enumerate(ending_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 200 + i*40))
-    
-    # Draw timeline integrity meter
-    meter_text = text_font.render(f"Final Timeline Integrity: {game_state.timeline_integrity}%", True, TEXT_COLOR)
-    screen.blit(meter_text, (SCREEN_WIDTH//2 - meter_text.get_width()//2, 400))
-    
-    meter_width = 600
-    pygame.draw.rect(screen, (50, 50, 50), (SCREEN_WIDTH//2 - meter_width//2, 450, meter_width, 20))
-    pygame.draw.rect(screen, CHRONOS_COLOR, (SCREEN_WIDTH//2 - meter_width//2, 450, meter_width * (game_state.timeline_integrity/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (SCREEN_WIDTH//2 - meter_width//2, 450, meter_width, 20), 2)
-    
-    # Draw menu button
-    menu_btn = Button(SCREEN_WIDTH//2 - 100, 550, 200, 50, "Return to Menu", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    menu_btn.update(mouse_pos)
-    menu_btn.draw(screen)
-    
-    return [menu_btn]
-
-# Echoes of the Void screens
-def draw_void_intro():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw title
-    title_text = title_font.render("ECHOES OF THE VOID", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-    
-    subtitle_text = heading_font.render("A Cosmic Horror Mystery", True, TEXT_COLOR)
-    screen.blit(subtitle_text, (SCREEN_WIDTH//2 - subtitle_text.get_width()//2, 180))
-    
-    # Draw intro text
-    intro_lines = [
-        "You arrive at the remote research station 'Event Horizon'",
-        "near the edge of known space. The station has gone silent.",
-        "As you explore, you discover the crew has been transformed",
-        "by an unknown cosmic entity. Ancient alien artifacts allow",
-        "communication with beings from outside our dimension,",
-        "but at what cost to your sanity?"
-    ]
-    
-    for i, line in enumerate(intro_lines):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 250 + i*40))
-    
-    # Draw start button
-    start_btn = Button(SCREEN_WIDTH//2 - 150, 500, 300, 50, "Begin Investigation", VOID_COLOR, (110, 50, 130), 
-                      lambda: setattr(game_state, 'current_screen', 'void_scenario_1'))
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    buttons = [start_btn, back_btn]
-    
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_void_scenario_1():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw sanity meter with frame
-    sanity_text = text_font.render(f"Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (50, 100))
-    
-    meter_width = 150
-    pygame.draw.rect(screen, (30, 30, 30), (50, 130, meter_width, 20))
-    pygame.draw.rect(screen, VOID_COLOR, (50, 130, meter_width * (game_state.sanity/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (50, 130, meter_width, 20), 2)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 1: The Artifact", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario text
-    scenario_text = [
-        "You discover the first alien artifact in the research lab.",
-        "It pulsates with an otherworldly energy and seems to whisper",
-        "to you. The station logs indicate the crew was studying",
-        "this object before they disappeared."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Destroy the artifact - it's too dangerous",
-        "B. Use the artifact - harness its power",
-        "C. Study the artifact - learn its secrets"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 350 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    actions = [
-        lambda: void_make_choice("destroy"),
-        lambda: void_make_choice("use"),
-        lambda: void_make_choice("study")
-    ]
-    
-    for i, (choice, action) in enumerate(zip(choices, actions)):
-        btn = Button(SCREEN_WIDTH//2 - 100, 500 + i*70, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=action)
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_void_scenario_2():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw sanity meter with frame
-    sanity_text = text_font.render(f"Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (50, 100))
-    
-    meter_width = 150
-    pygame.draw.rect(screen, (30, 30, 30), (50, 130, meter_width, 20))
-    pygame.draw.rect(screen, VOID_COLOR, (50, 130, meter_width * (game_state.sanity/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (50, 130, meter_width, 20), 2)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 2: The Survivor", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario text
-    scenario_text = [
-        "You find a surviving crew member hiding in the ventilation system.",
-        "She's terrified but has valuable information about what happened.",
-        "She begs you to help her escape, but helping her would mean",
-        "abandoning your investigation and potentially allowing the",
-        "entity to spread to other systems."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Save the survivor - prioritize human life",
-        "B. Continue investigating - the mission comes first",
-        "C. Question her thoroughly - get all information first"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 350 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    actions = [
-        lambda: void_make_choice("destroy"),
-        lambda: void_make_choice("use"),
-        lambda: void_make_choice("study")
-    ]
-    
-    for i, (choice, action) in enumerate(zip(choices, actions)):
-        btn = Button(SCREEN_WIDTH//2 - 100, 500 + i*70, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=action)
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_void_scenario_3():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw sanity meter with frame
-    sanity_text = text_font.render(f"Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (50, 100))
-    
-    meter_width = 150
-    pygame.draw.rect(screen, (30, 30, 30), (50, 130, meter_width, 20))
-    pygame.draw.rect(screen, VOID_COLOR, (50, 130, meter_width * (game_state.sanity/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (50, 130, meter_width, 20), 2)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 3: The Entity", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario text
-    scenario_text = [
-        "You come face to face with the cosmic entity itself.",
-        "It offers you unimaginable knowledge and power in exchange",
-        "for allowing it to use you as a gateway to our dimension.",
-        "You feel its presence in your mind, tempting you with",
-        "visions of cosmic understanding beyond human comprehension."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Resist the entity - fight its influence",
-        "B. Embrace the entity - accept its power",
-        "C. Bargain with the entity - seek a middle path"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 350 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    actions = [
-        lambda: void_make_choice("destroy"),
-        lambda: void_make_choice("use"),
-        lambda: void_make_choice("study")
-    ]
-    
-    for i, (choice, action) in enumerate(zip(choices, actions)):
-        btn = Button(SCREEN_WIDTH//2 - 100, 500 + i*70, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=action)
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_void_scenario_4():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw sanity meter with frame
-    sanity_text = text_font.render(f"Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (50, 100))
-    
-    meter_width = 150
-    pygame.draw.rect(screen, (30, 30, 30), (50, 130, meter_width, 20))
-    pygame.draw.rect(screen, VOID_COLOR, (50, 130, meter_width * (game_state.sanity/100), 20))
-    pygame.draw.rect(screen, TEXT_COLOR, (50, 130, meter_width, 20), 2)
-    
-    # Draw scenario title
-    title_text = heading_font.render("Scenario 4: The Final Choice", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 50))
-    
-    # Draw scenario text
-    scenario_text = [
-        "You've reached the heart of the station where the main",
-        "dimensional rift is located. The entity is at its strongest here.",
-        "You have the means to seal the rift permanently, but doing so",
-        "would trap you on this side. Alternatively, you could attempt",
-        "to control the rift, with unpredictable consequences."
-    ]
-    
-    for i, line in enumerate(scenario_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 150 + i*40))
-    
-    # Draw choices
-    choice_text = [
-        "A. Seal the rift - sacrifice yourself to save humanity",
-        "B. Control the rift - attempt to master its power",
-        "C. Escape - leave the station and warn others"
-    ]
-    
-    for i, line in enumerate(choice_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 350 + i*40))
-    
-    # Draw choice buttons
-    buttons = []
-    choices = ["A", "B", "C"]
-    actions = [
-        lambda: void_make_choice("destroy"),
-        lambda: void_make_choice("use"),
-        lambda: void_make_choice("study")
-    ]
-    
-    for i, (choice, action) in enumerate(zip(choices, actions)):
-        btn = Button(SCREEN_WIDTH//2 - 100, 500 + i*70, 200, 50, f"Choose {choice}", 
-                    BUTTON_COLOR, BUTTON_HOVER, action=action)
-        buttons.append(btn)
-    
-    back_btn = Button(50, 50, 150, 40, "Back", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    buttons.append(back_btn)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    for btn in buttons:
-        btn.update(mouse_pos)
-        btn.draw(screen)
-    
-    return buttons
-
-def draw_void_ending_madness():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw ending title
-    title_text = heading_font.render("Descended into Madness", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-    
-    # Draw ending text
-    ending_text = [
-        "The cosmic entity has consumed your mind. You now see",
-        "the true nature of reality, but it has driven you insane.",
-        "You become a vessel for the entity, spreading its influence",
-        "to new worlds and dimensions. Your humanity is lost,",
-        "but you have gained unimaginable power at a terrible cost."
-    ]
-    
-    for i, line in enumerate(ending_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 200 + i*40))
-    
-    # Draw final sanity
-    sanity_text = text_font.render(f"Final Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (SCREEN_WIDTH//2 - sanity_text.get_width()//2, 450))
-    
-    # Draw menu button
-    menu_btn = Button(SCREEN_WIDTH//2 - 100, 550, 200, 50, "Return to Menu", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    menu_btn.update(mouse_pos)
-    menu_btn.draw(screen)
-    
-    return [menu_btn]
-
-def draw_void_ending_safe():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw ending title
-    title_text = heading_font.render("The Void Contained", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-    
-    # Draw ending text
-    ending_text = [
-        "You successfully contained the cosmic entity and sealed",
-        "the rift between dimensions. The station is destroyed,",
-        "but you managed to save the surviving crew members.",
-        "Your report leads to a galaxy-wide warning about the dangers",
-        "of researching alien artifacts without proper safeguards."
-    ]
-    
-    for i, line in enumerate(ending_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 200 + i*40))
-    
-    # Draw final sanity
-    sanity_text = text_font.render(f"Final Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (SCREEN_WIDTH//2 - sanity_text.get_width()//2, 450))
-    
-    # Draw menu button
-    menu_btn = Button(SCREEN_WIDTH//2 - 100, 550, 200, 50, "Return to Menu", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    menu_btn.update(mouse_pos)
-    menu_btn.draw(screen)
-    
-    return [menu_btn]
-
-def draw_void_ending_mixed():
-    screen.fill(BACKGROUND)
-    
-    # Draw void particles
-    for particle in game_state.void_particles:
-        x, y, size, speed, color = particle
-        pygame.draw.circle(screen, color, (int(x), int(y)), size)
-        particle[1] += speed
-        if particle[1] > SCREEN_HEIGHT:
-            particle[1] = 0
-            particle[0] = random.randint(0, SCREEN_WIDTH)
-    
-    # Draw ending title
-    title_text = heading_font.render("A Fragile Balance", True, VOID_COLOR)
-    screen.blit(title_text, (SCREEN_WIDTH//2 - title_text.get_width()//2, 100))
-    
-    # Draw ending text
-    ending_text = [
-        "You managed to contain the entity but not without cost.",
-        "The rift is stabilized but not completely closed, requiring",
-        "constant monitoring. You've retained some of your sanity",
-        "but are forever changed by what you've experienced.",
-        "You now lead the effort to study and control the entity,",
-        "walking a fine line between discovery and damnation."
-    ]
-    
-    for i, line in enumerate(ending_text):
-        text = text_font.render(line, True, TEXT_COLOR)
-        screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 200 + i*40))
-    
-    # Draw final sanity
-    sanity_text = text_font.render(f"Final Sanity: {game_state.sanity}%", True, TEXT_COLOR)
-    screen.blit(sanity_text, (SCREEN_WIDTH//2 - sanity_text.get_width()//2, 450))
-    
-    # Draw menu button
-    menu_btn = Button(SCREEN_WIDTH//2 - 100, 550, 200, 50, "Return to Menu", BUTTON_COLOR, BUTTON_HOVER, return_to_menu)
-    
-    mouse_pos = pygame.mouse.get_pos()
-    menu_btn.update(mouse_pos)
-    menu_btn.draw(screen)
-    
-    return [menu_btn]
-
-# Store current buttons globally
-current_buttons = []
-
-# Main game loop
-clock = pygame.time.Clock()
-running = True
-
-while running:
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Get buttons for current screen
-    if game_state.current_screen == "main_menu":
-        current_buttons = draw_main_menu()
-    elif game_state.current_screen == "aetherian_intro":
-        current_buttons = draw_aetherian_intro()
-    elif game_state.current_screen.startswith("aetherian_scenario_"):
-        scenario_num = int(game_state.current_screen.split("_")[-1])
-        if scenario_num == 1:
-            current_buttons = draw_aetherian_scenario_1()
-        elif scenario_num == 2:
-            current_buttons = draw_aetherian_scenario_2()
-        elif scenario_num == 3:
-            current_buttons = draw_aetherian_scenario_3()
-        elif scenario_num == 4:
-            current_buttons = draw_aetherian_scenario_4()
-    elif game_state.current_screen == "aetherian_judgment":
-        current_buttons = draw_aetherian_judgment()
-    elif game_state.current_screen == "chronos_intro":
-        current_buttons = draw_chronos_intro()
-    elif game_state.current_screen == "chronos_scenario_1":
-        current_buttons = draw_chronos_scenario_1()
-    elif game_state.current_screen == "chronos_ending":
-        current_buttons = draw_chronos_ending()
-    elif game_state.current_screen == "void_intro":
-        current_buttons = draw_void_intro()
-    elif game_state.current_screen == "void_scenario_1":
-        current_buttons = draw_void_scenario_1()
-    elif game_state.current_screen == "void_scenario_2":
-        current_buttons = draw_void_scenario_2()
-    elif game_state.current_screen == "void_scenario_3":
-        current_buttons = draw_void_scenario_3()
-    elif game_state.current_screen == "void_scenario_4":
-        current_buttons = draw_void_scenario_4()
-    elif game_state.current_screen == "void_ending_madness":
-        current_buttons = draw_void_ending_madness()
-    elif game_state.current_screen == "void_ending_safe":
-        current_buttons = draw_void_ending_safe()
-    elif game_state.current_screen == "void_ending_mixed":
-        current_buttons = draw_void_ending_mixed()
-    
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+        # Handle events
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.WINDOWEXPOSED:
+                renderer.invalidate()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                profiler_overlay.toggle()
+            elif transitions.active:
+                # The screen still shows a snapshot, and clicks and keys
+                # would act on buttons the player has not seen yet
+                continue
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                if game_state.current_screen != "main_menu":
+                    return_to_menu()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_BACKSPACE:
+                undo_choice()
+            else:
+                # Goes to the current screen's buttons, which change as
+                # soon as a click switches screens
+                widgets.handle_event(event)
+        profiler.lap("events")
         
-        # Handle button events
-        for button in current_buttons:
-            if button.handle_event(event):
-                break
-    
-    # Update typing animation
-    game_state.update_typing()
-    
-    pygame.display.flip()
-    clock.tick(60)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+        # Update typing animation; it waits while a transition shows a snapshot
+        if not transitions.active:
+            active_screen.update()
+        profiler.lap("update")
+        profiler.end()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RPG Game Collection")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="record frame times and write them to PATH on exit (.json or .csv)")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record input to PATH for replay.py")
+    parser.add_argument("--telemetry", metavar="DIR",
+                        help="log choices and endings to JSON Lines files in DIR")
+    parser.add_argument("--slot", default="autosave",
+                        help="save slot to autosave into and --continue from (default: autosave)")
+    parser.add_argument("--continue", dest="resume", action="store_true",
+                        help="resume the run saved in the slot")
+    parser.add_argument("--no-autosave", action="store_true", help="do not save progress")
+    parser.add_argument("--no-transitions", action="store_true",
+                        help="switch screens at once instead of fading between them")
+    args = parser.parse_args(argv)
+    if args.record and args.resume:
+        parser.error("--record always starts a new game")
+    
+    global telemetry, autosaver
+    if args.profile:
+        profiler.enable()
+    if args.telemetry:
+        from telemetry import TelemetryLog
+        telemetry = TelemetryLog(args.telemetry)
+    seed = secrets.randbits(32) if args.record else None
+    init(seed, not args.no_transitions)
+    if args.resume or not args.no_autosave:
+        import savegame
+        path = savegame.slot_path(args.slot)
+        if args.resume:
+            resume(path)
+        if not args.no_autosave:
+            autosaver = savegame.AutoSaver(path)
+    try:
+        if args.record:
+            from replay import Recorder
+            recorder = Recorder(args.record, seed, transitions.enabled)
+            try:
+                run(recorder=recorder)
+            finally:
+                recorder.close(game_state.snapshot())
+        else:
+            run()
+    finally:
+        # Flushes the last save even when the game loop failed
+        if autosaver is not None:
+            autosaver.close()
+            if autosaver.error is not None:
+                print(f"Autosave to {autosaver.path} failed: {autosaver.error}", file=sys.stderr)
+    assets.close()
+    pygame.quit()
+    if telemetry is not None:
+        telemetry.close()
+    if args.profile:
+        profiler.write(args.profile)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# Multi-session game server.
+# Every connection plays its own GameSession over a line-based text
+# protocol, on a local TCP port or a Unix socket:
+#   SCREEN          show the current screen again
+#   PRESS <n>       press the nth button of the screen
+#   CHOOSE <A|B|C>  press a scenario choice, like the keyboard shortcuts
+#   UNDO            take back the last choice
+#   REWIND <n>      go back to before choice n (0 is before the first)
+#   STATS           server counters
+#   QUIT            end the session
+# The server sends the current screen on connect and after every command.
+# Every reply is a block of lines ending with "END":
+#   SCREEN <id>
+#   TEXT <line>              text in draw order, templates filled in
+#   METER <field> <value>
+#   BUTTON <n> <key|-> <label>
+#   ERR <reason>             the command was not carried out
+# Sessions that send nothing for --idle-timeout seconds are closed.
+import argparse
+import asyncio
+import os
+import stat
+import sys
+import time
+from functools import lru_cache
+
+from game_engine import GameSession
+from scenario_pack import CHOICE_ACTIONS, load_pack, screen_state, screen_text
+
+CHOICE_KEYS = ("A", "B", "C")
+
+def enter(session, screen_id):
+    session.current_screen = screen_id
+
+# Button actions applied to a session instead of the window's game state
+ACTIONS = {
+    "select_aetherian": lambda session: enter(session, "aetherian_intro"),
+    "select_chronos": lambda session: enter(session, "chronos_intro"),
+    "select_void": lambda session: enter(session, "void_intro"),
+    "return_to_menu": GameSession.reset,
+    "enter": enter,
+    "select_role": GameSession.select_role,
+    "make_choice": GameSession.make_choice,
+    "chronos_make_choice": GameSession.chronos_make_choice,
+    "void_make_choice": GameSession.void_make_choice
+}
+
+def run_action(session, action):
+    name, _, argument = action.partition(":")
+    if argument:
+        ACTIONS[name](session, argument)
+    else:
+        ACTIONS[name](session)
+
+def button_keys(buttons):
+    # Shortcut letter per button, or None
+    keys = iter(CHOICE_KEYS)
+    return [next(keys, None) if action.partition(":")[0] in CHOICE_ACTIONS else None
+            for _, _, _, _, action in buttons]
+
+class Player:
+    __slots__ = ("session", "writer", "last_seen")
+
+    def __init__(self, writer):
+        self.session = GameSession(history=True)
+        self.writer = writer
+        self.last_seen = time.monotonic()
+
+class GameServer:
+    def __init__(self, pack, idle_timeout=300.0):
+        self.pack = pack
+        self.idle_timeout = idle_timeout
+        self.players = set()
+        self.started = 0
+        self.finished = 0
+        self.evicted = 0
+        self.commands = 0
+        self.evictor = None
+        # Screens look the same for every session in the same state, so
+        # replies are rendered once per (screen, variant, values)
+        self.render = lru_cache(maxsize=4096)(self.render_screen)
+
+    def render_screen(self, screen_id, variant, values):
+        screen = self.pack.screen(screen_id)
+        lines = [f"SCREEN {screen_id}"]
+        for item in screen_text(screen, variant, dict(values)):
+            if item[0] == "text":
+                lines.append(f"TEXT {item[1]}")
+            else:
+                lines.append(f"METER {item[1]} {item[2]:g}")
+        buttons = screen[4]
+        for number, (button, key) in enumerate(zip(buttons, button_keys(buttons)), 1):
+            lines.append(f"BUTTON {number} {key or '-'} {button[1]}")
+        lines.append("END\n")
+        return "\n".join(lines).encode("utf-8")
+
+    def reply(self, session):
+        screen = self.pack.screen(session.current_screen)
+        variant, values = screen_state(screen, session)
+        return self.render(session.current_screen, variant, tuple(values.items()))
+
+    def command(self, session, line):
+        # Returns (reply bytes, whether to close the connection)
+        verb, _, argument = line.strip().partition(" ")
+        verb = verb.upper()
+        argument = argument.strip()
+        buttons = self.pack.screen(session.current_screen)[4]
+        if verb == "SCREEN":
+            return self.reply(session), False
+        elif verb == "PRESS":
+            if not argument.isdecimal() or not 1 <= int(argument) <= len(buttons):
+                return b"ERR no such button\nEND\n", False
+            run_action(session, buttons[int(argument) - 1][4])
+            return self.reply(session), False
+        elif verb == "CHOOSE":
+            keys = button_keys(buttons)
+            if argument.upper() not in keys:
+                return b"ERR no such choice on this screen\nEND\n", False
+            run_action(session, buttons[keys.index(argument.upper())][4])
+            return self.reply(session), False
+        elif verb == "UNDO":
+            if not session.undo():
+                return b"ERR nothing to undo\nEND\n", False
+            return self.reply(session), False
+        elif verb == "REWIND":
+            if not argument.isdecimal() or int(argument) >= session.steps():
+                return b"ERR no such step\nEND\n", False
+            session.rewind(int(argument))
+            return self.reply(session), False
+        elif verb == "STATS":
+            return (f"STATS sessions={len(self.players)} started={self.started} finished={self.finished} "
+                    f"evicted={self.evicted} commands={self.commands}\nEND\n").encode("utf-8"), False
+        elif verb == "QUIT":
+            return b"BYE\nEND\n", True
+        return b"ERR unknown command\nEND\n", False
+
+    async def handle(self, reader, writer):
+        player = Player(writer)
+        self.players.add(player)
+        self.started += 1
+        try:
+            writer.write(self.reply(player.session))
+            await writer.drain()
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The line went over the stream limit
+                    break
+                if not line:
+                    break
+                player.last_seen = time.monotonic()
+                self.commands += 1
+                reply, done = self.command(player.session, line.decode("utf-8", "replace"))
+                writer.write(reply)
+                await writer.drain()
+                if done:
+                    break
+        except ConnectionError:
+            # Dropped connections
+            pass
+        finally:
+            self.players.discard(player)
+            self.finished += 1
+            writer.close()
+
+    async def evict_idle(self):
+        while True:
+            await asyncio.sleep(max(0.05, self.idle_timeout / 4))
+            cutoff = time.monotonic() - self.idle_timeout
+            for player in [player for player in self.players if player.last_seen < cutoff]:
+                # Closing the stream ends the player's handler
+                self.evicted += 1
+                player.writer.write(b"BYE idle\nEND\n")
+                player.writer.close()
+
+async def start(server, host="127.0.0.1", port=7777, path=None):
+    # Returns the listening asyncio server; idle eviction runs alongside it
+    if path:
+        listener = await asyncio.start_unix_server(server.handle, path, backlog=1024)
+    else:
+        listener = await asyncio.start_server(server.handle, host, port, backlog=1024)
+    server.evictor = asyncio.ensure_future(server.evict_idle())
+    return listener
+
+async def serve(args):
+    server = GameServer(load_pack(), args.idle_timeout)
+    listener = await start(server, args.host, args.port, args.unix)
+    where = args.unix or "{}:{}".format(*listener.sockets[0].getsockname()[:2])
+    print(f"serving on {where}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the games to many local text clients at once.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--idle-timeout", type=float, default=300.0,
+                        help="close sessions idle for this many seconds")
+    args = parser.parse_args(argv)
+
+    if args.unix and os.path.exists(args.unix):
+        # A socket left by an earlier server is replaced; anything else is kept
+        if not stat.S_ISSOCK(os.stat(args.unix).st_mode):
+            parser.error(f"{args.unix} exists and is not a socket")
+        os.remove(args.unix)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+# Input recording and turbo replay.
+# `game_main.py --record FILE` appends every frame's pointer position and
+# input events to FILE, next to the seed the particle systems were built
+# with and whether screen transitions were on, since input is held back
+# while one plays. Replaying feeds the same input back frame by frame with
+# no frame cap, headless, and can check that the game ends in the recorded
+# state.
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+
+import pygame
+
+MAGIC = b"RPGR"
+VERSION = 2
+HEADER = struct.Struct("<4sHI")
+# Flags, from version 2
+FLAGS = struct.Struct("<B")
+FLAG_TRANSITIONS = 1
+# Frame number, pointer x/y, event count
+FRAME = struct.Struct("<IhhB")
+# Event type, value count
+EVENT = struct.Struct("<HB")
+VALUE = struct.Struct("<i")
+# Frame count, snapshot length
+END = struct.Struct("<II")
+TAG_FRAME = b"F"
+TAG_END = b"S"
+
+# Events the game reads, and the attributes kept for each as (name, size)
+EVENT_FIELDS = {
+    pygame.QUIT: (),
+    pygame.WINDOWEXPOSED: (),
+    pygame.MOUSEMOTION: (("pos", 2), ("rel", 2), ("buttons", 3)),
+    pygame.MOUSEBUTTONDOWN: (("pos", 2), ("button", 1)),
+    pygame.MOUSEBUTTONUP: (("pos", 2), ("button", 1)),
+    pygame.KEYDOWN: (("key", 1), ("mod", 1), ("scancode", 1)),
+    pygame.KEYUP: (("key", 1), ("mod", 1), ("scancode", 1))
+}
+
+def encode_event(event):
+    values = []
+    for name, size in EVENT_FIELDS[event.type]:
+        value = getattr(event, name)
+        values.extend(value if size > 1 else (value,))
+    return EVENT.pack(event.type, len(values)) + b"".join(VALUE.pack(value) for value in values)
+
+def decode_event(event_type, values):
+    attributes = {}
+    index = 0
+    for name, size in EVENT_FIELDS[event_type]:
+        chunk = values[index:index + size]
+        attributes[name] = tuple(chunk) if size > 1 else chunk[0]
+        index += size
+    return pygame.event.Event(event_type, attributes)
+
+class Recorder:
+    def __init__(self, path, seed, transitions=True, flush_frames=60):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed) + FLAGS.pack(FLAG_TRANSITIONS if transitions else 0))
+        self.frames = 0
+        self.pointer = None
+        self.flush_frames = flush_frames
+
+    def frame(self, pointer, events):
+        events = [event for event in events if event.type in EVENT_FIELDS]
+        # Frames where nothing changed are implied by the next frame number
+        if events or pointer != self.pointer:
+            self.file.write(TAG_FRAME + FRAME.pack(self.frames, *pointer, len(events)))
+            for event in events:
+                self.file.write(encode_event(event))
+            self.pointer = pointer
+        self.frames += 1
+        if self.frames % self.flush_frames == 0:
+            self.file.flush()
+
+    def close(self, snapshot=None):
+        data = json.dumps(snapshot).encode("utf-8") if snapshot is not None else b""
+        self.file.write(TAG_END + END.pack(self.frames, len(data)) + data)
+        self.file.close()
+
+class Recording:
+    def __init__(self, seed, frames, frame_count, final_state, transitions=False):
+        self.seed = seed
+        self.transitions = transitions
+        # frame number -> (pointer, events)
+        self.frames = frames
+        # None when the recording was cut off
+        self.frame_count = frame_count
+        self.final_state = final_state
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, seed = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        if version not in (1, VERSION):
+            raise ValueError(f"Unsupported recording version: {version}")
+
+        frames = {}
+        frame_count = final_state = None
+        offset = HEADER.size
+        # Version 1 recordings predate transitions
+        transitions = False
+        if version >= 2:
+            transitions = bool(FLAGS.unpack_from(data, offset)[0] & FLAG_TRANSITIONS)
+            offset += FLAGS.size
+        try:
+            while offset < len(data):
+                tag = data[offset:offset + 1]
+                offset += 1
+                if tag == TAG_FRAME:
+                    number, x, y, count = FRAME.unpack_from(data, offset)
+                    offset += FRAME.size
+                    events = []
+                    for _ in range(count):
+                        event_type, size = EVENT.unpack_from(data, offset)
+                        offset += EVENT.size
+                        values = struct.unpack_from(f"<{size}i", data, offset)
+                        offset += VALUE.size * size
+                        events.append(decode_event(event_type, values))
+                    frames[number] = ((x, y), events)
+                elif tag == TAG_END:
+                    frame_count, length = END.unpack_from(data, offset)
+                    offset += END.size
+                    if length:
+                        final_state = json.loads(data[offset:offset + length])
+                    break
+                else:
+                    break
+        except struct.error:
+            # The game stopped mid-write; keep every complete frame
+            pass
+        return cls(seed, frames, frame_count, final_state, transitions)
+
+    def last_frame(self):
+        if self.frame_count is not None:
+            return self.frame_count - 1
+        return max(self.frames, default=0)
+
+class ReplayInput:
+    def __init__(self, recording):
+        self.recording = recording
+        self.frame = 0
+        self.pointer = (0, 0)
+        self.last_frame = recording.last_frame()
+
+    def mouse_position(self):
+        entry = self.recording.frames.get(self.frame)
+        if entry:
+            self.pointer = entry[0]
+        return self.pointer
+
+    def events(self, animating, fps=None):
+        # No frame cap: the next frame starts as soon as this one is done
+        entry = self.recording.frames.get(self.frame)
+        events = list(entry[1]) if entry else []
+        if self.frame >= self.last_frame and not any(event.type == pygame.QUIT for event in events):
+            events.append(pygame.event.Event(pygame.QUIT))
+        self.frame += 1
+        return events
+
+def replay(recording):
+    import game_main
+    game_main.init(recording.seed, recording.transitions)
+    source = ReplayInput(recording)
+    game_main.run(source)
+    return source.frame, game_main.game_state.snapshot()
+
+def differences(expected, actual):
+    return [f"{key}: recorded {expected[key]!r}, replayed {actual.get(key)!r}"
+            for key in expected if expected[key] != actual.get(key)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded session headless at full speed.")
+    parser.add_argument("recording")
+    parser.add_argument("--verify", action="store_true", help="fail unless the final game state matches")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times, e.g. for soak tests")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    recording = Recording.load(args.recording)
+    if recording.frame_count is None:
+        print("warning: recording was cut off; replaying the complete frames", file=sys.stderr)
+
+    status = 0
+    for run in range(args.repeat):
+        start = time.perf_counter()
+        frames, final_state = replay(recording)
+        elapsed = time.perf_counter() - start
+        print(f"run {run + 1}: {frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} frames/s), "
+              f"ended on {final_state['current_screen']}")
+        if args.verify:
+            if recording.final_state is None:
+                print("  no final state recorded to verify against")
+                status = 1
+                continue
+            found = differences(recording.final_state, final_state)
+            for line in found:
+                print(f"  mismatch {line}")
+            if found:
+                status = 1
+    pygame.quit()
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
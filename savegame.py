@@ -0,0 +1,136 @@
+# Save slots for a game session.
+# A save is one small binary record: a versioned header with a CRC of the
+# body, then the gameplay fields of the session. Particles, the typewriter
+# and other render state are not saved. Files are written to a temporary
+# name and renamed over the old save, so a crash leaves either the old or
+# the new save, never a torn one. AutoSaver does the writing on a
+# background thread so the frame loop only pays for encoding.
+import os
+import struct
+import sys
+import threading
+import zlib
+
+from game_engine import ROLES, CHRONOS_ERAS
+
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")
+MAGIC = b"RPGS"
+VERSION = 1
+# Magic, version, body CRC32
+HEADER = struct.Struct("<4sHI")
+# Role, scenarios completed, trait totals, era, timeline integrity,
+# Chronos tallies, Chronos scenario, sanity, Void scenario, screen id length
+STATE = struct.Struct("<bB3hBh3hBhBB")
+
+class SaveError(Exception):
+    pass
+
+def slot_path(slot, directory=SAVE_DIR):
+    return os.path.join(directory, f"{slot}.sav")
+
+def encode(session):
+    screen = session.current_screen.encode("utf-8")
+    body = STATE.pack(ROLES.index(session.player_role) if session.player_role else -1,
+                      session.scenarios_completed, *session.choices,
+                      CHRONOS_ERAS.index(session.time_era), session.timeline_integrity,
+                      *session.chronos_choices, session.chronos_scenario,
+                      session.sanity, session.void_scenario, len(screen)) + screen
+    return HEADER.pack(MAGIC, VERSION, zlib.crc32(body)) + body
+
+def decode_v1(body, session):
+    (role, session.scenarios_completed, honor, pragmatism, curiosity, era, session.timeline_integrity,
+     preservation, intervention, knowledge, session.chronos_scenario, session.sanity,
+     session.void_scenario, screen_length) = STATE.unpack_from(body)
+    session.player_role = ROLES[role] if role >= 0 else None
+    session.choices = [honor, pragmatism, curiosity]
+    session.time_era = CHRONOS_ERAS[era]
+    session.chronos_choices = [preservation, intervention, knowledge]
+    session.current_screen = body[STATE.size:STATE.size + screen_length].decode("utf-8")
+
+# Older versions keep their decoder so existing saves still load
+DECODERS = {1: decode_v1}
+
+def decode(data, session):
+    # Overwrites the gameplay fields of `session` with the saved ones
+    if len(data) < HEADER.size:
+        raise SaveError("Save file is truncated")
+    magic, version, crc = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SaveError("Not a save file")
+    if version not in DECODERS:
+        raise SaveError(f"Unsupported save version: {version}")
+    body = data[HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise SaveError("Save file is corrupt")
+    try:
+        DECODERS[version](body, session)
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise SaveError("Save file is corrupt")
+    # Earlier choices are not part of a save
+    if session.timeline is not None:
+        session.timeline.clear()
+    return session
+
+def write_atomic(path, data):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp = f"{path}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+def save(session, path):
+    write_atomic(path, encode(session))
+
+def load(path, session):
+    with open(path, "rb") as f:
+        return decode(f.read(), session)
+
+class AutoSaver:
+    def __init__(self, path):
+        self.path = path
+        self.pending = None
+        self.stopping = False
+        self.saves = 0
+        self.writes = 0
+        self.error = None
+        self.lock = threading.Condition()
+        self.thread = threading.Thread(target=self.write_loop, name="autosave", daemon=True)
+        self.thread.start()
+
+    def save(self, session):
+        data = encode(session)
+        with self.lock:
+            # Only the newest state matters; an older one still waiting is dropped
+            self.pending = data
+            self.saves += 1
+            self.lock.notify()
+
+    def close(self):
+        # Writes whatever is still pending, then stops the writer
+        with self.lock:
+            self.stopping = True
+            self.lock.notify()
+        self.thread.join()
+
+    # Writer thread
+    def write_loop(self):
+        while True:
+            with self.lock:
+                while self.pending is None and not self.stopping:
+                    self.lock.wait()
+                data, self.pending = self.pending, None
+            if data is None:
+                break
+            try:
+                write_atomic(self.path, data)
+                self.writes += 1
+                self.error = None
+            except OSError as exc:
+                # Reported once when saving starts failing; the game keeps running
+                if self.error is None:
+                    print(f"Autosave to {self.path} failed: {exc}", file=sys.stderr)
+                self.error = exc
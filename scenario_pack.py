@@ -0,0 +1,393 @@
+# Scenario content pack for the RPG Game Collection.
+# Screens are written as data in content/scenarios.json and compiled into
+# a compact binary pack: colors are resolved, every static line is measured
+# once and stored with its final position, and auto-sized buttons get
+# their rects. Loading a pack only reads the string table and the screen
+# index; each screen is decoded the first time it is shown.
+import argparse
+import array
+import json
+import os
+import struct
+import sys
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content")
+SOURCE_PATH = os.path.join(CONTENT_DIR, "scenarios.json")
+PACK_PATH = os.path.join(CONTENT_DIR, "scenarios.pack")
+
+SCREEN_WIDTH = 1024
+FONT_SIZES = {"title": 72, "heading": 48, "text": 36, "small": 28}
+COLORS = {
+    "TEXT_COLOR": (222, 207, 184),
+    "HIGHLIGHT": (255, 215, 0),
+    "BUTTON_COLOR": (60, 40, 70),
+    "BUTTON_HOVER": (90, 60, 100),
+    "AETHERIAN_COLOR": (180, 50, 50),
+    "MAGE_COLOR": (50, 100, 180),
+    "ROGUE_COLOR": (50, 150, 50),
+    "CHRONOS_COLOR": (50, 100, 180),
+    "VOID_COLOR": (80, 30, 100)
+}
+
+# Defaults for optional keys in the content file
+LINE_SPACING = 40
+BUTTON_PADDING = 40
+METER_FRAME = 2
+
+# Version of the content file format
+CONTENT_VERSION = 1
+
+MAGIC = b"RPGP"
+VERSION = 2
+HEADER = struct.Struct("<4sHII")
+INDEX_ENTRY = struct.Struct("<III")
+
+class PackError(Exception):
+    pass
+
+# Value encoding: every record is a nested tuple of ints, floats, strings
+# and None. Strings go through a shared table so repeated labels are
+# stored once.
+TAG_NONE = b"N"
+TAG_INT = b"i"
+TAG_FLOAT = b"f"
+TAG_STRING = b"s"
+TAG_TUPLE = b"t"
+INT = struct.Struct("<i")
+FLOAT = struct.Struct("<d")
+UINT = struct.Struct("<I")
+COUNT = struct.Struct("<H")
+
+class StringTable:
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def add(self, text):
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def pack(self):
+        encoded = [text.encode("utf-8") for text in self.strings]
+        offsets = array.array("I", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        return offsets.tobytes() + b"".join(encoded)
+
+def encode(value, strings, out):
+    if value is None:
+        out.append(TAG_NONE)
+    elif isinstance(value, int):
+        out.append(TAG_INT + INT.pack(value))
+    elif isinstance(value, float):
+        out.append(TAG_FLOAT + FLOAT.pack(value))
+    elif isinstance(value, str):
+        out.append(TAG_STRING + UINT.pack(strings.add(value)))
+    elif isinstance(value, (tuple, list)):
+        out.append(TAG_TUPLE + COUNT.pack(len(value)))
+        for item in value:
+            encode(item, strings, out)
+    else:
+        raise PackError(f"Cannot pack {type(value).__name__} value: {value!r}")
+
+# Compiling
+def resolve_color(color):
+    if isinstance(color, str):
+        if color not in COLORS:
+            raise PackError(f"Unknown color: {color}")
+        return COLORS[color]
+    return tuple(color)
+
+def template_fields(text):
+    # Field names used by a str.format template, e.g. "{alignment:.1f}"
+    fields = []
+    for part in text.split("{")[1:]:
+        fields.append(part.split("}")[0].split(":")[0])
+    return fields
+
+class Compiler:
+    def __init__(self, content):
+        import pygame
+        pygame.font.init()
+        self.fonts = {name: pygame.font.Font(None, size) for name, size in FONT_SIZES.items()}
+        self.content = content
+
+    def text(self, element, fields):
+        font_name = element.get("font", "text")
+        if font_name not in self.fonts:
+            raise PackError(f"Unknown font: {font_name}")
+        font = self.fonts[font_name]
+        y = element["y"]
+        spacing = element.get("spacing", LINE_SPACING)
+        lines = []
+        for i, line in enumerate(element["lines"]):
+            if not line:
+                continue
+            # Static lines are placed now; templates are centered after
+            # formatting, so they keep x = -1 unless the content pins it
+            x = element.get("x", -1)
+            template = "{" in line
+            if template:
+                fields.update(template_fields(line))
+            elif x < 0:
+                x = SCREEN_WIDTH // 2 - font.size(line)[0] // 2
+            lines.append((x, y + i * spacing, line, int(template)))
+        return ("text", font_name, resolve_color(element.get("color", "TEXT_COLOR")), tuple(lines))
+
+    def element(self, element, fields):
+        kind = element["type"]
+        if kind == "text":
+            return self.text(element, fields)
+        elif kind == "rect":
+            return ("rect", resolve_color(element["color"]), tuple(element["rect"]), element.get("width", 0))
+        elif kind == "circle":
+            return ("circle", resolve_color(element["color"]), tuple(element["center"]),
+                    element["radius"], element.get("width", 0))
+        elif kind == "meter":
+            fields.add(element["value"])
+            return ("meter", element["value"], tuple(element["rect"]), resolve_color(element["back"]),
+                    resolve_color(element["fill"]), resolve_color(element.get("frame", "TEXT_COLOR")),
+                    element.get("frame_width", METER_FRAME))
+        elif kind == "variant":
+            return ("variant",)
+        raise PackError(f"Unknown element type: {kind}")
+
+    def button(self, button):
+        label = button["label"]
+        rect = button.get("rect")
+        if rect is None:
+            # Auto-sized buttons fit their label and are centered
+            width = self.fonts["text"].size(label)[0] + BUTTON_PADDING
+            rect = (SCREEN_WIDTH // 2 - width // 2, button["y"], width, button["height"])
+        return (tuple(rect), label, resolve_color(button.get("color", "BUTTON_COLOR")),
+                resolve_color(button.get("hover", "BUTTON_HOVER")), button["action"])
+
+    def screen(self, screen_id, screen):
+        fields = set()
+        elements = tuple(self.element(element, fields) for element in screen.get("elements", ()))
+        variants = []
+        for name, variant in screen.get("variants", {}).items():
+            lookups = []
+            for field, lookup in variant.get("lookups", {}).items():
+                fields.add(lookup["key"])
+                lookups.append((field, lookup["key"], tuple(lookup["values"].items())))
+            variant_elements = tuple(self.element(element, fields) for element in variant["elements"])
+            variants.append((name, variant_elements, tuple(lookups)))
+        if variants and not any(element[0] == "variant" for element in elements):
+            raise PackError(f"{screen_id}: variants need a variant element")
+        # Lookup results are filled in per variant, not read from the game
+        for _, _, lookups in variants:
+            fields.difference_update(field for field, _, _ in lookups)
+        buttons = tuple(self.button(button) for button in screen.get("buttons", ()))
+        # Frame rate cap while the screen animates; None runs at the game's rate
+        fps = screen.get("fps")
+        if fps is not None and (not isinstance(fps, int) or fps <= 0):
+            raise PackError(f"{screen_id}: fps must be a positive integer")
+        return (screen.get("particles"), screen.get("variant"), elements, tuple(variants),
+                buttons, tuple(sorted(fields)), fps)
+
+    def check(self):
+        # Keys the compiler does not compile are checked against what the
+        # game actually uses, so editing them cannot silently do nothing
+        from game_engine import scenario_values
+        if self.content.get("version", CONTENT_VERSION) != CONTENT_VERSION:
+            raise PackError(f"Unsupported content version: {self.content['version']}")
+        if self.content.get("fonts", FONT_SIZES) != FONT_SIZES:
+            raise PackError(f"fonts must match the sizes the game loads: {FONT_SIZES}")
+        screens = self.content["screens"]
+        try:
+            scenarios = len(scenario_values(screens))
+        except ValueError as exc:
+            raise PackError(str(exc))
+        for screen_id, screen in screens.items():
+            if "trait_deltas" in screen and screen_id not in [f"aetherian_scenario_{number}"
+                                                              for number in range(1, scenarios + 1)]:
+                raise PackError(f"{screen_id}: trait_deltas only apply to aetherian_scenario_1 to {scenarios}")
+
+    def compile(self):
+        self.check()
+        strings = StringTable()
+        blobs = []
+        for screen_id, screen in self.content["screens"].items():
+            out = []
+            encode(self.screen(screen_id, screen), strings, out)
+            blobs.append((strings.add(screen_id), b"".join(out)))
+
+        index = []
+        offset = 0
+        for name_id, blob in blobs:
+            index.append(INDEX_ENTRY.pack(name_id, offset, len(blob)))
+            offset += len(blob)
+        return (HEADER.pack(MAGIC, VERSION, len(strings.strings), len(blobs)) + strings.pack()
+                + b"".join(index) + b"".join(blob for _, blob in blobs))
+
+def compile_pack(source=SOURCE_PATH, output=PACK_PATH):
+    with open(source, encoding="utf-8") as f:
+        content = json.load(f)
+    data = Compiler(content).compile()
+    # Write next to the target and swap in, so a running game never
+    # reads a half-written pack
+    temp = output + ".tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, output)
+    return len(data)
+
+# Loading
+class ScenarioPack:
+    def __init__(self, data):
+        magic, version, string_count, screen_count = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise PackError("Not a scenario pack")
+        if version != VERSION:
+            raise PackError(f"Unsupported scenario pack version: {version}")
+        self.data = memoryview(data)
+
+        offset = HEADER.size
+        self.string_offsets = array.array("I")
+        self.string_offsets.frombytes(data[offset:offset + (string_count + 1) * 4])
+        offset += (string_count + 1) * 4
+        self.string_base = offset
+        offset += self.string_offsets[-1]
+        self.strings = [None] * string_count
+
+        self.index = {}
+        for i in range(screen_count):
+            name_id, start, length = INDEX_ENTRY.unpack_from(data, offset + i * INDEX_ENTRY.size)
+            self.index[self.string(name_id)] = (start, length)
+        self.blob_base = offset + screen_count * INDEX_ENTRY.size
+        self.screens = {}
+
+    @classmethod
+    def load(cls, path=PACK_PATH):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def string(self, string_id):
+        text = self.strings[string_id]
+        if text is None:
+            start = self.string_base + self.string_offsets[string_id]
+            end = self.string_base + self.string_offsets[string_id + 1]
+            text = self.strings[string_id] = str(self.data[start:end], "utf-8")
+        return text
+
+    def decode(self, offset):
+        tag = self.data[offset:offset + 1].tobytes()
+        offset += 1
+        if tag == TAG_NONE:
+            return None, offset
+        elif tag == TAG_INT:
+            return INT.unpack_from(self.data, offset)[0], offset + INT.size
+        elif tag == TAG_FLOAT:
+            return FLOAT.unpack_from(self.data, offset)[0], offset + FLOAT.size
+        elif tag == TAG_STRING:
+            return self.string(UINT.unpack_from(self.data, offset)[0]), offset + UINT.size
+        elif tag == TAG_TUPLE:
+            count = COUNT.unpack_from(self.data, offset)[0]
+            offset += COUNT.size
+            items = []
+            for _ in range(count):
+                item, offset = self.decode(offset)
+                items.append(item)
+            return tuple(items), offset
+        raise PackError(f"Corrupt scenario pack at byte {offset - 1}")
+
+    def __contains__(self, screen_id):
+        return screen_id in self.index
+
+    def screen_ids(self):
+        return list(self.index)
+
+    def screen(self, screen_id):
+        screen = self.screens.get(screen_id)
+        if screen is None:
+            start, _ = self.index[screen_id]
+            screen = self.screens[screen_id] = self.decode(self.blob_base + start)[0]
+        return screen
+
+def is_stale(source=SOURCE_PATH, pack=PACK_PATH):
+    if not os.path.exists(pack):
+        return True
+    # Packs built by an older compiler are rebuilt too
+    with open(pack, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or HEADER.unpack(header)[:2] != (MAGIC, VERSION):
+        return True
+    return os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(pack)
+
+def load_pack(source=SOURCE_PATH, pack=PACK_PATH):
+    # Rebuild a missing or out-of-date pack before loading it
+    if is_stale(source, pack):
+        compile_pack(source, pack)
+    return ScenarioPack.load(pack)
+
+# Game state a screen can show, by the names its templates, meters and
+# variants use. Each takes the game session being shown.
+CONTENT_FIELDS = {
+    "role": lambda session: session.player_role,
+    "alignment": lambda session: session.calculate_alignment(),
+    "era": lambda session: session.time_era.capitalize(),
+    "timeline_integrity": lambda session: session.timeline_integrity,
+    "sanity": lambda session: session.sanity
+}
+
+VARIANT_SOURCES = {
+    "aetherian_ending": lambda session: session.aetherian_ending(),
+    "time_era": lambda session: session.time_era,
+    "chronos_ending": lambda session: session.chronos_ending()
+}
+
+# Buttons with these actions are a scenario's A, B and C choices, in order
+CHOICE_ACTIONS = ("make_choice", "chronos_make_choice", "void_make_choice")
+
+def screen_state(screen, session):
+    # (variant, values) of a compiled screen for a game session
+    _, variant_source, _, _, _, fields, _ = screen
+    values = {field: CONTENT_FIELDS[field](session) for field in fields}
+    variant = VARIANT_SOURCES[variant_source](session) if variant_source else None
+    return variant, values
+
+def screen_text(screen, variant, values):
+    # The text lines and meters of a screen in draw order, as
+    # ("text", line) and ("meter", field, value)
+    _, _, elements, variants, _, _, _ = screen
+    values = dict(values)
+    variant_elements = ()
+    for name, elements_of_variant, lookups in variants:
+        if name == variant:
+            variant_elements = elements_of_variant
+            for field, key, table in lookups:
+                values[field] = dict(table)[values[key]]
+
+    def walk(elements):
+        for element in elements:
+            if element[0] == "text":
+                for _, _, line, template in element[3]:
+                    yield ("text", line.format(**values) if template else line)
+            elif element[0] == "meter":
+                yield ("meter", element[1], values[element[1]])
+            elif element[0] == "variant":
+                yield from walk(variant_elements)
+
+    return list(walk(elements))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile scenario content into a binary pack.")
+    parser.add_argument("source", nargs="?", default=SOURCE_PATH)
+    parser.add_argument("-o", "--output", default=PACK_PATH)
+    parser.add_argument("--list", action="store_true", help="list the screens in the compiled pack")
+    args = parser.parse_args(argv)
+
+    size = compile_pack(args.source, args.output)
+    pack = ScenarioPack.load(args.output)
+    print(f"{args.output}: {len(pack.index)} screens, {size} bytes")
+    if args.list:
+        for screen_id in pack.screen_ids():
+            print(f"  {screen_id}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# Session telemetry for analytics.
+# record() only puts a tuple on a bounded queue and never waits: when the
+# queue is full the record is dropped and counted. A background thread
+# turns records into JSON lines and writes them in batches, flushing
+# when a batch is full or the flush interval passes, and starts a new
+# file once the current one reaches max_bytes.
+import glob
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+class TelemetryLog:
+    def __init__(self, directory, max_queue=10000, batch_size=256, flush_interval=1.0,
+                 max_bytes=1024 * 1024, max_files=20):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        # Ties together every record from one run of the game
+        self.session_id = uuid.uuid4().hex[:12]
+        self.queue = queue.Queue(max_queue)
+        self.dropped = 0
+        self.written = 0
+        self.files = 0
+        self.file = None
+        self.stopping = threading.Event()
+
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self.write_loop, name="telemetry", daemon=True)
+        self.thread.start()
+
+    def record(self, kind, **fields):
+        try:
+            self.queue.put_nowait((time.time(), kind, fields))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5.0):
+        # Stops the writer after it drains the queue
+        self.stopping.set()
+        try:
+            # Wake the writer if it is waiting on an empty queue
+            self.queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self.thread.join(timeout)
+
+    # Writer thread
+    def write_loop(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                batch.append(self.queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            stopping = self.stopping.is_set()
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline or stopping:
+                # Take whatever else is already waiting in the same write
+                while len(batch) < self.batch_size * 4:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if batch:
+                    self.write(batch)
+                    batch = []
+                deadline = time.monotonic() + self.flush_interval
+                if stopping and self.queue.empty():
+                    break
+        self.write_summary()
+        if self.file:
+            self.file.close()
+
+    def write(self, batch):
+        lines = []
+        for item in batch:
+            if item is None:
+                continue
+            timestamp, kind, fields = item
+            record = {"t": round(timestamp, 3), "session": self.session_id, "kind": kind}
+            record.update(fields)
+            lines.append(json.dumps(record, separators=(",", ":")))
+        if not lines:
+            return
+        data = "\n".join(lines) + "\n"
+
+        if self.file is None or self.file.tell() + len(data) > self.max_bytes:
+            self.rotate()
+        self.file.write(data)
+        self.file.flush()
+        self.written += len(lines)
+
+    def write_summary(self):
+        # Lets analytics tell a quiet session from a lossy one
+        self.write([(time.time(), "telemetry", {"written": self.written, "dropped": self.dropped})])
+
+    def rotate(self):
+        if self.file:
+            self.file.close()
+        self.files += 1
+        name = f"telemetry-{time.strftime('%Y%m%d-%H%M%S')}-{self.session_id}-{self.files:04d}.jsonl"
+        self.file = open(os.path.join(self.directory, name), "w")
+
+        # Keep only the newest files
+        paths = sorted(glob.glob(os.path.join(self.directory, "telemetry-*.jsonl")))
+        for path in paths[:-self.max_files]:
+            os.remove(path)